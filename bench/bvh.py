@@ -0,0 +1,115 @@
+"""
+BVH ray casts and frustum queries against brute force on ~100k triangles.
+
+Run from the repository root:  python -m bench.bvh [--rays N]
+"""
+import argparse
+import math
+import time
+import numpy as np
+
+from core.matrix import Matrix4
+from core.vector import Vector3
+from scene.bvh import SceneBVH, intersect_triangles
+from scene.camera import Camera
+from scene.mesh import Mesh
+from scene.node import SceneNode
+from scene.transform import Transform
+
+def brute_force(origin, direction, v0, e1, e2):
+    t = intersect_triangles(origin, direction, v0, e1, e2)
+    k = int(np.argmin(t))
+    return (k, float(t[k])) if np.isfinite(t[k]) else None
+
+def random_rays(rng, count, target_radius):
+    origins = rng.normal(size=(count, 3))
+    origins *= 40.0 / np.linalg.norm(origins, axis=1, keepdims=True)
+    targets = rng.uniform(-target_radius, target_radius, (count, 3))
+    directions = targets - origins
+    return origins, directions / np.linalg.norm(directions, axis=1, keepdims=True)
+
+def bench_mesh(rng, rays):
+    mesh = Mesh.create_sphere(5.0, 224, 224)
+    start = time.perf_counter()
+    bvh = mesh.bvh()
+    build = time.perf_counter() - start
+    tris = mesh.positions[mesh.indices]
+    v0, e1, e2 = tris[:, 0], tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0]
+
+    origins, directions = random_rays(rng, rays, 6.0)
+    start = time.perf_counter()
+    fast = [bvh.raycast(o, d) for o, d in zip(origins, directions)]
+    t_bvh = time.perf_counter() - start
+    start = time.perf_counter()
+    slow = [brute_force(o, d, v0, e1, e2) for o, d in zip(origins, directions)]
+    t_brute = time.perf_counter() - start
+    agree = sum(
+        (a is None and b is None) or (a is not None and b is not None and math.isclose(a[1], b[1]))
+        for a, b in zip(fast, slow)
+    )
+
+    start = time.perf_counter()
+    bvh.refit(mesh.positions * 1.01)
+    refit = time.perf_counter() - start
+
+    print(f"mesh: {mesh.face_count} triangles, build {build * 1000:.0f} ms, refit {refit * 1000:.0f} ms")
+    print(f"  ray cast  bvh {t_bvh / rays * 1e6:9.1f} us/ray   brute {t_brute / rays * 1e6:9.1f} us/ray"
+          f"   speedup {t_brute / t_bvh:6.1f}x   agree {agree}/{rays}")
+
+def bench_scene(rng, rays):
+    # 100 spheres of ~1k triangles each scattered through a 100-unit cube
+    root = SceneNode()
+    sphere = Mesh.create_sphere(1.0, 23, 23)
+    for p in rng.uniform(-50, 50, (100, 3)):
+        root.add_child(SceneNode(sphere, Transform(position=Vector3(*p))))
+    start = time.perf_counter()
+    scene = SceneBVH(root)
+    build = time.perf_counter() - start
+
+    world = []
+    for node in root.children:
+        m = node.world_matrix(Matrix4.identity()).to_array()
+        world.append(sphere.positions @ m[:3, :3].T + m[:3, 3])
+    tris = np.concatenate([w[sphere.indices] for w in world])
+    v0, e1, e2 = tris[:, 0], tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0]
+
+    origins, directions = random_rays(rng, rays, 50.0)
+    start = time.perf_counter()
+    fast = [scene.raycast(o, d) for o, d in zip(origins, directions)]
+    t_bvh = time.perf_counter() - start
+    start = time.perf_counter()
+    slow = [brute_force(o, d, v0, e1, e2) for o, d in zip(origins, directions)]
+    t_brute = time.perf_counter() - start
+    agree = sum(
+        (a is None and b is None) or (a is not None and b is not None and math.isclose(a[2], b[1]))
+        for a, b in zip(fast, slow)
+    )
+
+    cam = Camera(Vector3(0, 0, 80), Vector3(0, 0, 0), Vector3(0, 1, 0), math.radians(30), 16 / 9, 0.1, 200.0)
+    frustum = cam.get_frustum()
+    start = time.perf_counter()
+    visible = scene.query_frustum(frustum)
+    t_query = time.perf_counter() - start
+
+    for node in root.children[::10]:
+        node.transform.position = Vector3(*rng.uniform(-50, 50, 3))
+    start = time.perf_counter()
+    moved = scene.refit()
+    refit = time.perf_counter() - start
+
+    print(f"scene: {len(root.children)} nodes, {len(tris)} triangles, build {build * 1000:.0f} ms")
+    print(f"  ray cast  bvh {t_bvh / rays * 1e6:9.1f} us/ray   brute {t_brute / rays * 1e6:9.1f} us/ray"
+          f"   speedup {t_brute / t_bvh:6.1f}x   agree {agree}/{rays}")
+    print(f"  frustum query {t_query * 1000:.2f} ms ({len(visible)} nodes), refit of {moved} moved nodes {refit * 1000:.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rays", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+    bench_mesh(rng, args.rays)
+    bench_scene(rng, args.rays)
+
+if __name__ == "__main__":
+    main()
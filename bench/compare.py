@@ -0,0 +1,43 @@
+"""
+Diff two bench.suite JSON files by median time.
+
+    python -m bench.compare base.json new.json [--threshold 0.10]
+
+Exits with status 1 when any stage got slower than the threshold allows.
+"""
+import argparse
+import json
+import sys
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    print(f"base {base['meta'].get('commit')}  ->  new {new['meta'].get('commit')}")
+
+    regressions = 0
+    for name in sorted(set(base["results"]) | set(new["results"])):
+        a = base["results"].get(name)
+        b = new["results"].get(name)
+        if a is None or b is None:
+            print(f"{name:<32} {'only in ' + ('new' if a is None else 'base'):>30}")
+            continue
+        ratio = b["median_ms"] / a["median_ms"] if a["median_ms"] else float("inf")
+        flag = ""
+        if ratio > 1.0 + args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif ratio < 1.0 - args.threshold:
+            flag = "  faster"
+        print(f"{name:<32} {a['median_ms']:10.3f} -> {b['median_ms']:10.3f} ms  {ratio:6.2f}x{flag}")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Early-Z rejection on a high-overdraw scene: rows of spheres stacked in
+depth behind a large wall, drawn with and without the hi-Z buffer and
+front-to-back sorting.
+
+Run from the repository root:  python -m bench.hiz [--frames N]
+"""
+import argparse
+import math
+import time
+import numpy as np
+
+from core.matrix import Matrix4
+from core.profiling import profiler
+from core.vector import Vector3
+from render.pipeline import render_mesh, sort_front_to_back
+from render.rasterizer import Rasterizer
+from render.target import RenderTarget
+from scene.camera import Camera
+from scene.mesh import Mesh
+
+WIDTH, HEIGHT = 800, 600
+
+def make_scene(layers: int = 12, seed: int = 0) -> list:
+    """(mesh, model) draws in back-to-front order, the worst case without early-Z."""
+    rng = np.random.default_rng(seed)
+    sphere = Mesh.create_sphere(1.0, 24, 48)
+    draws = []
+    for layer in range(layers):
+        z = -4.0 * (layers - 1 - layer)
+        for x, y in rng.uniform((-6, -4), (6, 4), (16, 2)):
+            draws.append((sphere, Matrix4.translation(x, y, z) @ Matrix4.scale(1.5, 1.5, 1.5)))
+    # A wall in front hiding most of the spheres
+    wall = Mesh(
+        np.array([[-1, -1, 0], [1, -1, 0], [1, 1, 0], [-1, 1, 0]], dtype=float),
+        [(0, 1, 2), (0, 2, 3)],
+        [(90, 90, 90), (90, 90, 90)],
+    )
+    draws.append((wall, Matrix4.translation(0, 0, 4) @ Matrix4.scale(8, 6, 1)))
+    return draws
+
+def render(raster, target, draws, view_proj, use_hiz: bool) -> None:
+    target.clear()
+    hiz = target.hiz if use_hiz else None
+    for mesh, model in draws:
+        render_mesh(raster, mesh, view_proj @ model, target.framebuffer, target.depthbuffer, hiz=hiz)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=5)
+    args = parser.parse_args()
+
+    cam = Camera(Vector3(0, 0, 14), Vector3(0, 0, 0), Vector3(0, 1, 0),
+                 math.radians(60), WIDTH / HEIGHT, 0.1, 100.0)
+    view_proj = cam.get_view_projection_matrix()
+    draws = make_scene()
+    sorted_draws = sort_front_to_back(draws, view_proj)
+    raster = Rasterizer(WIDTH, HEIGHT)
+    target = RenderTarget(WIDTH, HEIGHT)
+    triangles = sum(mesh.face_count for mesh, _ in draws)
+    print(f"{WIDTH}x{HEIGHT}, {len(draws)} draws, {triangles} triangles")
+    print(f"{'variant':<24} {'ms':>8} {'speedup':>8} {'pixels':>9} {'draws out':>9} {'tris out':>9}")
+
+    profiler.enabled = True
+    reference = None
+    base = None
+    for name, order, use_hiz in (
+        ("back-to-front", draws, False),
+        ("back-to-front + hi-Z", draws, True),
+        ("front-to-back", sorted_draws, False),
+        ("front-to-back + hi-Z", sorted_draws, True),
+    ):
+        render(raster, target, order, view_proj, use_hiz)  # warm-up
+        profiler.reset()
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            render(raster, target, order, view_proj, use_hiz)
+            profiler.end_frame()
+        ms = (time.perf_counter() - start) / args.frames * 1000.0
+        counters = profiler.average()["counters"]
+        base = base or ms
+
+        image = target.framebuffer.copy()
+        if reference is None:
+            reference = image
+        same = "" if np.array_equal(image, reference) else "  (image differs!)"
+        print(f"{name:<24} {ms:8.1f} {base / ms:7.2f}x {counters.get('pixels_shaded', 0):9.0f}"
+              f" {counters.get('draws_occluded', 0):9.0f} {counters.get('triangles_occluded', 0):9.0f}{same}")
+    target.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+10k copies of one mesh: a SceneNode per copy against one InstancedMesh.
+
+Run from the repository root:  python -m bench.instancing [--count N] [--frames N]
+"""
+import argparse
+import math
+import time
+import numpy as np
+
+from core.matrix import Matrix4
+from core.quaternion import Quaternion
+from core.vector import Vector3
+from render.pipeline import render_instances, render_mesh
+from render.rasterizer import Rasterizer
+from render.target import RenderTarget
+from scene.camera import Camera
+from scene.instancing import InstancedMesh
+from scene.mesh import Mesh
+from scene.node import SceneNode
+from scene.transform import Transform
+
+WIDTH, HEIGHT = 800, 600
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--frames", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    positions = rng.uniform((-40, -30, -80), (40, 30, -5), (args.count, 3))
+    rotations = rng.normal(size=(args.count, 4))
+    rotations /= np.linalg.norm(rotations, axis=1, keepdims=True)
+    scales = rng.uniform(0.3, 1.0, args.count)
+    mesh = Mesh.create_cube(1.0)
+
+    cam = Camera(Vector3(0, 0, 10), Vector3(0, 0, 0), Vector3(0, 1, 0),
+                 math.radians(60), WIDTH / HEIGHT, 0.1, 200.0)
+    view_proj = cam.get_view_projection_matrix()
+    frustum = cam.get_frustum()
+    raster = Rasterizer(WIDTH, HEIGHT)
+    target = RenderTarget(WIDTH, HEIGHT)
+
+    root = SceneNode()
+    for p, q, s in zip(positions, rotations, scales):
+        root.add_child(SceneNode(mesh, Transform(Vector3(*p), Quaternion(*q), Vector3(s, s, s))))
+
+    def draw_node(node, world):
+        if node.mesh is not None:
+            render_mesh(raster, node.mesh, view_proj @ world, target.framebuffer, target.depthbuffer)
+
+    def nodes_frame():
+        for node in root.children:
+            node.transform.mark_dirty()  # animated: every matrix is rebuilt
+        target.clear()
+        root.traverse(Matrix4.identity(), draw_node, frustum)
+
+    instances = InstancedMesh(mesh)
+
+    def instanced_frame():
+        instances.set_trs(positions, rotations, scales)
+        target.clear()
+        render_instances(raster, instances, view_proj, target.framebuffer, target.depthbuffer, frustum=frustum)
+
+    images = []
+    print(f"{args.count} instances of a {mesh.face_count}-triangle mesh, {WIDTH}x{HEIGHT}")
+    base = None
+    for name, frame in (("scene nodes", nodes_frame), ("instanced", instanced_frame)):
+        frame()
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            frame()
+        ms = (time.perf_counter() - start) / args.frames * 1000.0
+        base = base or ms
+        images.append(target.framebuffer.copy())
+        print(f"{name:<12} {ms:9.1f} ms  {base / ms:6.1f}x")
+    print(f"identical images: {np.array_equal(*images)}")
+    target.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Mesh load times: text OBJ, binary PLY and the memory-mapped cache.
+
+Writes a dense sphere in each format to a temporary directory and times
+loading it back.
+
+Run from the repository root:  python -m bench.loaders [--rings N]
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+
+from scene.loaders import CACHE_SUFFIX, load_cache, load_obj, load_ply, save_cache
+from scene.mesh import Mesh
+
+def write_obj(mesh: Mesh, path: str) -> None:
+    with open(path, "w") as f:
+        np.savetxt(f, mesh.positions, fmt="v %.7g %.7g %.7g")
+        np.savetxt(f, mesh.indices + 1, fmt="f %d %d %d")
+
+def write_ply(mesh: Mesh, path: str) -> None:
+    faces = np.empty(len(mesh.indices), dtype=[("n", "u1"), ("v", "<i4", (3,))])
+    faces["n"] = 3
+    faces["v"] = mesh.indices
+    with open(path, "wb") as f:
+        f.write(
+            f"ply\nformat binary_little_endian 1.0\n"
+            f"element vertex {len(mesh.positions)}\n"
+            f"property float x\nproperty float y\nproperty float z\n"
+            f"element face {len(mesh.indices)}\n"
+            f"property list uchar int vertex_indices\nend_header\n".encode("ascii")
+        )
+        f.write(mesh.positions.astype("<f4").tobytes())
+        f.write(faces.tobytes())
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000.0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rings", type=int, default=500)
+    args = parser.parse_args()
+
+    mesh = Mesh.create_sphere(1.0, args.rings, 2 * args.rings)
+    mesh = Mesh(mesh.positions.astype(np.float32), mesh.indices, mesh.colors)
+    print(f"{mesh.vertex_count} vertices, {mesh.face_count} triangles")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        obj, ply = os.path.join(tmp, "mesh.obj"), os.path.join(tmp, "mesh.ply")
+        cache = os.path.join(tmp, "mesh" + CACHE_SUFFIX)
+        write_obj(mesh, obj)
+        write_ply(mesh, ply)
+
+        rows = []
+        loaded, ms = timed(load_obj, obj)
+        rows.append(("obj", obj, ms, loaded))
+        loaded, ms = timed(load_ply, ply)
+        rows.append(("ply", ply, ms, loaded))
+        _, save_ms = timed(save_cache, loaded, cache)
+        loaded, ms = timed(load_cache, cache)
+        rows.append(("cache (mapped)", cache, ms, loaded))
+        # Touching every byte shows the cost once the pages are actually read
+        _, touch_ms = timed(lambda m: (m.positions.sum(), m.indices.sum()), loaded)
+        rows.append(("cache (+ read all)", cache, ms + touch_ms, loaded))
+
+        print(f"{'format':<20} {'size MB':>8} {'load ms':>9}  match")
+        for name, path, ms, result in rows:
+            match = np.allclose(result.positions, mesh.positions) and np.array_equal(result.indices, mesh.indices)
+            print(f"{name:<20} {os.path.getsize(path) / 1e6:8.1f} {ms:9.1f}  {match}")
+        print(f"cache write {save_ms:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Frame time and triangle load of a field of spheres receding from the
+camera, drawn at full detail and with distance-based LOD selection.
+
+Run from the repository root:  python -m bench.lod [--frames N] [--count N]
+"""
+import argparse
+import math
+import time
+import numpy as np
+
+from core.matrix import Matrix4
+from core.vector import Vector3
+from render.pipeline import render_mesh
+from render.rasterizer import Rasterizer
+from render.target import RenderTarget
+from scene.camera import Camera
+from scene.lod import LODChain
+from scene.mesh import Mesh
+from scene.node import SceneNode
+from scene.transform import Transform
+
+WIDTH, HEIGHT = 800, 600
+
+def make_scene(chain: LODChain, count: int, seed: int = 0) -> SceneNode:
+    rng = np.random.default_rng(seed)
+    root = SceneNode()
+    for _ in range(count):
+        z = 2.0 - 150.0 * rng.uniform(0, 1) ** 2
+        x, y = rng.uniform(-0.5, 0.5, 2) * (20 - z)
+        root.add_child(SceneNode(transform=Transform(position=Vector3(x, y, z)), lod=chain))
+    return root
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=3)
+    parser.add_argument("--count", type=int, default=200)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    chain = LODChain.build(Mesh.create_sphere(2.0, 48, 96), levels=6)
+    build = (time.perf_counter() - start) * 1000.0
+    print(f"LOD chain {[m.face_count for m in chain.levels]} triangles, built in {build:.0f} ms")
+    print(f"min sizes (px) {np.round(chain.min_sizes, 1).tolist()}")
+
+    cam = Camera(Vector3(0, 0, 10), Vector3(0, 0, 0), Vector3(0, 1, 0),
+                 math.radians(60), WIDTH / HEIGHT, 0.1, 200.0)
+    view_proj = cam.get_view_projection_matrix()
+    frustum = cam.get_frustum()
+    root = make_scene(chain, args.count)
+    raster = Rasterizer(WIDTH, HEIGHT)
+    target = RenderTarget(WIDTH, HEIGHT)
+
+    print(f"{'variant':<12} {'ms':>8} {'triangles':>10}  levels used")
+    for name, lod in (("full detail", False), ("lod", True)):
+        triangles = 0
+        levels = np.zeros(len(chain), dtype=int)
+
+        def draw(node, world):
+            nonlocal triangles
+            if node.mesh is None:
+                return
+            mesh = node.active_mesh if lod else node.mesh
+            triangles += mesh.face_count
+            levels[node.lod_level if lod else 0] += 1
+            render_mesh(raster, mesh, view_proj @ world, target.framebuffer, target.depthbuffer)
+
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            triangles = 0
+            levels[:] = 0
+            target.clear()
+            root.traverse(Matrix4.identity(), draw, frustum,
+                          camera=cam if lod else None, viewport_height=HEIGHT)
+        ms = (time.perf_counter() - start) / args.frames * 1000.0
+        print(f"{name:<12} {ms:8.1f} {triangles:10d}  {levels.tolist()}")
+    target.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Cost of presenting the framebuffer: per-frame make_surface (old path)
+against the persistent shared surface used by Window.present.
+
+Runs headless with SDL's dummy video driver unless one is already set.
+Run from the repository root:  python -m bench.present [--frames N]
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame as pg
+
+from ui.window import Window
+
+def make_surface_present(win: Window) -> None:
+    surf = pg.surfarray.make_surface(win.framebuffer.swapaxes(0, 1))
+    win.screen.blit(surf, (0, 0))
+    pg.display.flip()
+
+def measure(fn, win: Window, frames: int) -> float:
+    fn(win)  # warm-up
+    start = time.perf_counter()
+    for _ in range(frames):
+        fn(win)
+    return (time.perf_counter() - start) / frames * 1000.0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--height", type=int, default=600)
+    args = parser.parse_args()
+
+    win = Window(args.width, args.height, "present benchmark")
+    win.framebuffer[:] = np.random.default_rng(0).integers(0, 256, win.framebuffer.shape)
+
+    print(f"{args.width}x{args.height}, {args.frames} frames")
+    for name, fn in (("make_surface", make_surface_present), ("Window.present", Window.present)):
+        print(f"{name:>15}: {measure(fn, win, args.frames):7.3f} ms/frame")
+    win.destroy()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Speed and edge correctness of the raster modes.
+
+A jittered grid mesh fills a rectangle with triangles that share every
+inner edge. Drawing each triangle into its own coverage count shows pixels
+drawn twice along shared edges and cracks left between them; timings cover
+the grid, small triangles and one large triangle.
+
+Run from the repository root:  python -m bench.raster_modes [--frames N]
+"""
+import argparse
+import time
+import numpy as np
+
+from core.vector import Vector3
+from render import jit
+from render.rasterizer import MODES, Rasterizer
+
+WIDTH, HEIGHT = 640, 480
+
+def grid_mesh(cells: int = 24, seed: int = 0):
+    """
+    Rectangle split into 2*cells*cells triangles with fractional vertex
+    positions; only the inner vertices are jittered so the outline stays
+    axis-aligned. Returns positions, indices, colors and the rectangle.
+    """
+    rng = np.random.default_rng(seed)
+    rect = (20.25, WIDTH - 20.75, 15.5, HEIGHT - 15.25)
+    gx, gy = np.meshgrid(np.linspace(rect[0], rect[1], cells + 1), np.linspace(rect[2], rect[3], cells + 1))
+    inner = (slice(1, -1), slice(1, -1))
+    gx[inner] += rng.uniform(-5, 5, gx[inner].shape)
+    gy[inner] += rng.uniform(-5, 5, gy[inner].shape)
+    depth = rng.uniform(-0.9, 0.9, gx.shape)
+    positions = np.stack([gx, gy, depth], axis=-1).reshape(-1, 3)
+
+    a = (np.arange(cells)[:, None] * (cells + 1) + np.arange(cells)).ravel()
+    b, c, d = a + 1, a + cells + 1, a + cells + 2
+    # Counter-clockwise on screen (y down), so front-facing
+    indices = np.concatenate([np.stack([a, c, b], axis=1), np.stack([b, c, d], axis=1)])
+    colors = rng.integers(1, 256, (len(indices), 3))
+    return positions, indices, colors, rect
+
+def coverage(raster: Rasterizer, positions, indices) -> np.ndarray:
+    """How many triangles of the mesh write each pixel when drawn alone."""
+    counts = np.zeros((HEIGHT, WIDTH), dtype=np.int32)
+    framebuffer = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    depthbuffer = np.empty((HEIGHT, WIDTH))
+    white = np.array([[255, 255, 255]])
+    for tri in indices:
+        framebuffer[:] = 0
+        depthbuffer[:] = np.inf
+        raster.draw_mesh(positions, tri[None], white, framebuffer, depthbuffer)
+        counts += framebuffer[:, :, 0] > 0
+    return counts
+
+def time_draw(draw, framebuffer, depthbuffer, frames: int) -> float:
+    draw()  # warm-up
+    total = 0.0
+    for _ in range(frames):
+        framebuffer[:] = 0
+        depthbuffer[:] = np.inf
+        start = time.perf_counter()
+        draw()
+        total += time.perf_counter() - start
+    return total / frames * 1000.0
+
+def render_all(raster: Rasterizer, scenes, big) -> tuple[np.ndarray, np.ndarray]:
+    """Every test scene drawn into one fresh frame, for comparing modes."""
+    framebuffer = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    depthbuffer = np.full((HEIGHT, WIDTH), np.inf, dtype=np.float32)
+    for positions, indices, colors in scenes:
+        raster.draw_mesh(positions, indices, colors, framebuffer, depthbuffer)
+        raster.draw_mesh(positions, indices, colors, framebuffer, depthbuffer, cull_backfaces=False)
+    raster.draw_triangle(*big, (255, 0, 0), framebuffer, depthbuffer)
+    return framebuffer, depthbuffer
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=5)
+    args = parser.parse_args()
+
+    positions, indices, colors, (x0, x1, y0, y1) = grid_mesh()
+    # Pixels whose centers lie inside the rectangle
+    cx = np.arange(WIDTH) + 0.5
+    cy = (np.arange(HEIGHT) + 0.5)[:, None]
+    inside = (cx > x0) & (cx < x1) & (cy > y0) & (cy < y1)
+
+    rng = np.random.default_rng(1)
+    small_xy = rng.uniform((0, 0), (WIDTH, HEIGHT), (2000, 1, 2)) + rng.uniform(-4, 4, (2000, 3, 2))
+    small = np.concatenate([small_xy, rng.uniform(-1, 1, (2000, 3, 1))], axis=-1).reshape(-1, 3)
+    small_idx = np.arange(len(small)).reshape(-1, 3)
+    small_colors = rng.integers(0, 256, (len(small_idx), 3))
+    big = (Vector3(10.3, 470.6, 0.2), Vector3(630.4, 240.1, 0.4), Vector3(30.7, 5.2, -0.3))
+
+    framebuffer = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    depthbuffer = np.empty((HEIGHT, WIDTH))
+    print(f"{len(indices)}-triangle grid, {WIDTH}x{HEIGHT}")
+    print(f"{'mode':<12}{'double':>8}{'cracks':>8}{'grid ms':>10}{'2k small ms':>13}{'large ms':>10}")
+    for mode in MODES:
+        if mode == "jit" and not jit.AVAILABLE:
+            print(f"{mode:<12}skipped, Numba is not installed")
+            continue
+        raster = Rasterizer(WIDTH, HEIGHT, mode)
+        counts = coverage(raster, positions, indices)
+        double = int(np.count_nonzero(counts > 1))
+        cracks = int(np.count_nonzero((counts == 0) & inside))
+        grid_ms = time_draw(lambda: raster.draw_mesh(positions, indices, colors, framebuffer, depthbuffer),
+                            framebuffer, depthbuffer, args.frames)
+        small_ms = time_draw(lambda: raster.draw_mesh(small, small_idx, small_colors, framebuffer, depthbuffer),
+                             framebuffer, depthbuffer, args.frames)
+        large_ms = time_draw(lambda: raster.draw_triangle(*big, (255, 0, 0), framebuffer, depthbuffer),
+                             framebuffer, depthbuffer, args.frames)
+        print(f"{mode:<12}{double:8d}{cracks:8d}{grid_ms:10.1f}{small_ms:13.1f}{large_ms:10.1f}")
+
+    if jit.AVAILABLE:
+        # The compiled kernels promise the numpy mode's exact pixels and depths
+        scenes = [(positions, indices, colors), (small, small_idx, small_colors)]
+        ref = render_all(Rasterizer(WIDTH, HEIGHT, "numpy"), scenes, big)
+        out = render_all(Rasterizer(WIDTH, HEIGHT, "jit"), scenes, big)
+        same = np.array_equal(ref[0], out[0]) and np.array_equal(ref[1], out[1])
+        print(f"jit identical to numpy: {same}")
+
+if __name__ == "__main__":
+    main()
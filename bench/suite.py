@@ -0,0 +1,233 @@
+"""
+Headless rendering benchmark suite.
+
+Times each pipeline stage on fixed, seeded scenes and writes JSON that can
+be diffed between commits with bench.compare:
+
+    python -m bench.suite --out results.json
+    python -m bench.compare base.json results.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable
+
+import numpy as np
+
+from core.matrix import Matrix4
+from core import quaternion
+from core.quaternion import Quaternion
+from core.vector import Vector3
+from render.pipeline import VertexCache, prepare_mesh
+from render import jit
+from render.rasterizer import DEFAULT_MODE, Rasterizer
+from render.target import RenderTarget
+from scene.camera import Camera
+from scene.mesh import Mesh
+from scene.node import SceneNode
+from scene.transform import Transform, trs_matrices
+
+WIDTH, HEIGHT = 800, 600
+
+def timeit(fn: Callable[[], object], repeat: int, setup: Callable[[], object] = None) -> dict:
+    """Run fn repeat times after one warm-up; setup (untimed) runs before every call."""
+    if setup:
+        setup()
+    fn()
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return {
+        "median_ms": statistics.median(samples),
+        "min_ms": min(samples),
+        "mean_ms": statistics.fmean(samples),
+        "repeat": repeat,
+    }
+
+# ---- scenes ----
+
+def huge_triangle():
+    # Covers most of the screen; CCW on screen so it is front-facing
+    return [Vector3(-50, -50, 0.5), Vector3(WIDTH + 50, HEIGHT / 2, 0.5), Vector3(-50, HEIGHT + 50, 0.5)][::-1]
+
+def tiny_triangles(count: int = 20000, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform((0, 0), (WIDTH, HEIGHT), (count, 2))
+    angles = rng.uniform(0, 2 * np.pi, (count, 1)) + np.array([0.0, 2.1, 4.2])
+    xy = centers[:, None, :] + 2.0 * np.stack([np.cos(angles), -np.sin(angles)], axis=-1)
+    z = rng.uniform(-1, 1, (count, 1, 1)).repeat(3, axis=1)
+    positions = np.concatenate([xy, z], axis=-1).reshape(-1, 3)
+    indices = np.arange(len(positions)).reshape(-1, 3)
+    colors = rng.integers(0, 256, (count, 3))
+    return positions, indices, colors
+
+def dense_mesh():
+    return Mesh.create_sphere(1.5, 160, 320)
+
+def deep_hierarchy(depth: int = 2000, fanout_nodes: int = 8000, seed: int = 2):
+    # A long chain plus a wide random tree under one root
+    rng = np.random.default_rng(seed)
+    root = SceneNode()
+    node = root
+    for _ in range(depth):
+        child = SceneNode(transform=Transform(position=Vector3(0.001, 0, 0)))
+        node.add_child(child)
+        node = child
+    nodes = [root]
+    for _ in range(fanout_nodes):
+        child = SceneNode(transform=Transform(
+            position=Vector3(*rng.normal(size=3)),
+            rotation=Quaternion(*rng.normal(size=4)).normalized(),
+        ))
+        nodes[rng.integers(len(nodes))].add_child(child)
+        nodes.append(child)
+    return root, nodes
+
+def camera() -> Camera:
+    return Camera(
+        position=Vector3(0, 0, 5), target=Vector3(0, 0, 0), up=Vector3(0, 1, 0),
+        fov=math.radians(60), aspect=WIDTH / HEIGHT, near=0.1, far=100.0,
+    )
+
+# ---- stages ----
+
+def run(repeat: int, include_present: bool) -> dict:
+    results = {}
+    target = RenderTarget(WIDTH, HEIGHT)
+    raster = Rasterizer(WIDTH, HEIGHT)
+    clear = lambda: target.clear()
+
+    transforms = [
+        Transform(position=Vector3(i, 0, 0), rotation=Quaternion.from_axis_angle(Vector3(0, 1, 0), i))
+        for i in range(1000)
+    ]
+    def rebuild_matrices():
+        for t in transforms:
+            t.mark_dirty()
+            t.matrix()
+    results["transform_matrix/1k_dirty"] = timeit(rebuild_matrices, repeat)
+
+    # Array-driven animation: slerp 10k rotations and rebuild their matrices
+    rng = np.random.default_rng(3)
+    key_a = quaternion.normalize(rng.normal(size=(10000, 4)))
+    key_b = quaternion.normalize(rng.normal(size=(10000, 4)))
+    offsets = rng.normal(size=(10000, 3))
+    results["quaternion/slerp_trs_10k"] = timeit(
+        lambda: trs_matrices(offsets, quaternion.slerp(key_a, key_b, 0.25)), repeat
+    )
+    trs_buffer = np.empty((10000, 4, 4))
+    results["transform_matrix/trs_10k_out"] = timeit(
+        lambda: trs_matrices(offsets, key_a, out=trs_buffer), repeat
+    )
+
+    root, nodes = deep_hierarchy()
+    noop = lambda node, world: None
+    results["scene_traverse/deep_static"] = timeit(lambda: root.traverse(Matrix4.identity(), noop), repeat)
+    def touch_all():
+        for n in nodes[1:]:
+            n.transform.mark_dirty()
+    results["scene_traverse/deep_dirty"] = timeit(
+        lambda: root.traverse(Matrix4.identity(), noop), repeat, setup=touch_all
+    )
+
+    mesh = dense_mesh()
+    cam = camera()
+    mvp = cam.get_view_projection_matrix()
+    results["vertex_transform/dense_mesh"] = timeit(
+        lambda: mvp.transform_points_homogeneous(mesh.positions), repeat
+    )
+    results["vertex_stage/dense_mesh"] = timeit(lambda: prepare_mesh(mesh, mvp, WIDTH, HEIGHT), repeat)
+    cache = VertexCache()
+    results["vertex_stage/dense_mesh_cached"] = timeit(lambda: cache.get(mesh, mvp, WIDTH, HEIGHT), repeat)
+
+    v0, v1, v2 = huge_triangle()
+    results["draw_triangle/huge"] = timeit(
+        lambda: raster.draw_triangle(v0, v1, v2, (255, 0, 0), target.framebuffer, target.depthbuffer),
+        repeat, setup=clear,
+    )
+    incremental = Rasterizer(WIDTH, HEIGHT, "incremental")
+    results["draw_triangle/huge_incremental"] = timeit(
+        lambda: incremental.draw_triangle(v0, v1, v2, (255, 0, 0), target.framebuffer, target.depthbuffer),
+        repeat, setup=clear,
+    )
+
+    positions, indices, colors = tiny_triangles()
+    small = [Vector3(*p) for p in positions[:3000]]
+    def tiny_loop():
+        for i in range(0, len(small), 3):
+            raster.draw_triangle(small[i], small[i + 1], small[i + 2], (0, 255, 0),
+                                 target.framebuffer, target.depthbuffer)
+    results["draw_triangle/tiny_1k_loop"] = timeit(tiny_loop, repeat, setup=clear)
+    tiny_1k = (positions[:3000], indices[:1000], colors[:1000])
+    results["draw_mesh/tiny_1k_incremental"] = timeit(
+        lambda: incremental.draw_mesh(*tiny_1k, target.framebuffer, target.depthbuffer),
+        repeat, setup=clear,
+    )
+    results["draw_mesh/tiny_20k"] = timeit(
+        lambda: raster.draw_mesh(positions, indices, colors, target.framebuffer, target.depthbuffer),
+        repeat, setup=clear,
+    )
+    screen, dense_idx, dense_colors = prepare_mesh(mesh, mvp, WIDTH, HEIGHT)
+    results["draw_mesh/dense_mesh"] = timeit(
+        lambda: raster.draw_mesh(screen, dense_idx, dense_colors, target.framebuffer, target.depthbuffer),
+        repeat, setup=clear,
+    )
+
+    if include_present:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        try:
+            from ui.window import Window
+            win = Window(WIDTH, HEIGHT, "bench")
+        except Exception as exc:  # no pygame / no video driver available
+            print(f"skipping present: {exc}", file=sys.stderr)
+        else:
+            results["present/window"] = timeit(win.present, repeat)
+            win.destroy()
+
+    return results
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "numba": jit.numba.__version__ if jit.AVAILABLE else None,
+        "raster_mode": DEFAULT_MODE,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "resolution": [WIDTH, HEIGHT],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="write JSON results to this file")
+    parser.add_argument("--no-present", action="store_true", help="skip the pygame present stage")
+    args = parser.parse_args()
+
+    results = run(args.repeat, not args.no_present)
+    for name, r in results.items():
+        print(f"{name:<32} {r['median_ms']:10.3f} ms  (min {r['min_ms']:.3f})")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"meta": metadata(), "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Frame time of the tiled rasterizer against worker count at 1080p.
+
+Run from the repository root:  python -m bench.tiled [--frames N] [--tile 128]
+"""
+import argparse
+import os
+import time
+import numpy as np
+
+from render.rasterizer import Rasterizer
+from render.tiled import SharedFrame, TiledRasterizer
+
+WIDTH, HEIGHT = 1920, 1080
+
+def make_scene(n_small: int = 20000, n_large: int = 40, seed: int = 0):
+    """
+    Screen-space triangle soup: many small triangles plus a few large ones,
+    all wound so they survive backface culling.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform((0, 0), (WIDTH, HEIGHT), (n_small + n_large, 2))
+    radius = np.r_[rng.uniform(3, 12, n_small), rng.uniform(200, 600, n_large)]
+    angles = rng.uniform(0, 2 * np.pi, (len(centers), 1)) + np.array([0.0, 2.1, 4.2])
+    xy = centers[:, None, :] + radius[:, None, None] * np.stack(
+        [np.cos(angles), -np.sin(angles)], axis=-1
+    )
+    depth = rng.uniform(-1, 1, (len(centers), 1, 1)).repeat(3, axis=1)
+    positions = np.concatenate([xy, depth], axis=-1).reshape(-1, 3)
+    indices = np.arange(len(positions)).reshape(-1, 3)
+    colors = rng.integers(0, 256, (len(indices), 3))
+    return positions, indices, colors
+
+def time_frames(raster, scene, framebuffer, depthbuffer, frames: int) -> float:
+    raster.draw_mesh(*scene, framebuffer, depthbuffer)  # warm-up
+    start = time.perf_counter()
+    for _ in range(frames):
+        framebuffer[:] = 0
+        depthbuffer[:] = np.inf
+        raster.draw_mesh(*scene, framebuffer, depthbuffer)
+    return (time.perf_counter() - start) / frames * 1000.0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=5)
+    parser.add_argument("--tile", type=int, default=128)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    scene = make_scene()
+    frame = SharedFrame(WIDTH, HEIGHT)
+    fb, db = frame.framebuffer, frame.depthbuffer
+
+    base = time_frames(Rasterizer(WIDTH, HEIGHT), scene, fb, db, args.frames)
+    print(f"{WIDTH}x{HEIGHT}, {len(scene[1])} triangles, tile {args.tile}px")
+    print(f"single-threaded Rasterizer: {base:8.1f} ms")
+    print(f"{'workers':>7} {'threads ms':>11} {'speedup':>8} {'procs ms':>10} {'speedup':>8}")
+
+    workers = 1
+    while workers <= args.max_workers:
+        with TiledRasterizer(WIDTH, HEIGHT, args.tile, workers) as r:
+            t_ms = time_frames(r, scene, fb, db, args.frames)
+        with TiledRasterizer(WIDTH, HEIGHT, args.tile, workers, processes=True, frame=frame) as r:
+            p_ms = time_frames(r, scene, fb, db, args.frames)
+        print(f"{workers:>7} {t_ms:>11.1f} {base / t_ms:>7.2f}x {p_ms:>10.1f} {base / p_ms:>7.2f}x")
+        workers *= 2
+
+    del fb, db
+    frame.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Per-op latency and allocation of Vector3/Matrix4 hot paths, against the
+previous array-backed Vector3 (one 3-element ndarray per vector).
+
+Run from the repository root:  python -m bench.vector [--iterations N]
+"""
+import argparse
+import math
+import time
+import tracemalloc
+import numpy as np
+
+from core.matrix import Matrix4
+from core.vector import Vector3
+from scene.camera import Camera
+
+class ArrayVector3:
+    """The array-backed Vector3 this module measures against."""
+    __slots__ = ("_v",)
+
+    def __init__(self, x, y, z):
+        self._v = np.array([x, y, z], dtype=float)
+
+    @property
+    def x(self):
+        return self._v[0]
+
+    @property
+    def y(self):
+        return self._v[1]
+
+    @property
+    def z(self):
+        return self._v[2]
+
+    def __add__(self, other):
+        return ArrayVector3(*(self._v + other._v))
+
+    def __sub__(self, other):
+        return ArrayVector3(*(self._v - other._v))
+
+    def dot(self, other):
+        return float(self._v @ other._v)
+
+    def cross(self, other):
+        return ArrayVector3(*np.cross(self._v, other._v))
+
+    def normalized(self):
+        x, y, z = self._v
+        norm = math.sqrt(x*x + y*y + z*z)
+        if norm:
+            return ArrayVector3(*(self._v / norm))
+        return ArrayVector3(0.0, 0.0, 0.0)
+
+
+def _array_transform_point(m: Matrix4, v) -> ArrayVector3:
+    # The previous Matrix4.transform_point
+    res4 = m.to_array() @ np.array([v.x, v.y, v.z, 1.0], dtype=float)
+    w = res4[3]
+    if w != 0 and w != 1:
+        return ArrayVector3(res4[0]/w, res4[1]/w, res4[2]/w)
+    return ArrayVector3(res4[0], res4[1], res4[2])
+
+def _array_view_matrix(position, target, up) -> Matrix4:
+    # The previous Camera.get_view_matrix, rebuilt on every call
+    forward = (target - position).normalized()
+    right = forward.cross(up).normalized()
+    up_true = right.cross(forward)
+    return Matrix4([
+        [ right.x,  right.y,  right.z, -right.dot(position) ],
+        [ up_true.x,up_true.y,up_true.z,-up_true.dot(position) ],
+        [-forward.x,-forward.y,-forward.z, forward.dot(position)],
+        [ 0.0,       0.0,       0.0,       1.0                    ],
+    ])
+
+def measure(op, iterations: int) -> tuple[float, float]:
+    """(ns per call, peak traced bytes per call) of op()."""
+    for _ in range(100):
+        op()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        op()
+    ns = (time.perf_counter() - start) / iterations * 1e9
+
+    # Peak bytes held at once during a call, temporaries included
+    calls = 100
+    total = 0
+    tracemalloc.start()
+    for _ in range(calls):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        op()
+        total += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return ns, total / calls
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+
+    a, b, out = Vector3(1, 2, 3), Vector3(-4, 0.5, 2), Vector3.scratch()
+    la, lb = ArrayVector3(1, 2, 3), ArrayVector3(-4, 0.5, 2)
+    m = Matrix4.perspective(math.radians(60), 4 / 3, 0.1, 100.0) @ Matrix4.translation(0, 0, -5)
+    product = Matrix4.scratch()
+    points = np.random.default_rng(0).normal(size=(1000, 3))
+    points_out, points_work = np.empty((1000, 3)), np.empty((1000, 4))
+
+    up, legacy_up = Vector3(0, 1, 0), ArrayVector3(0, 1, 0)
+    cam = Camera(a, b, up, math.radians(60), 4 / 3, 0.1, 100.0)
+
+    def rebuild_view():
+        cam.position = a  # invalidates the cached view matrix
+        return cam.get_view_matrix()
+
+    cases = [
+        ("add", lambda: la + lb, lambda: a + b),
+        ("add out=", None, lambda: a.add(b, out)),
+        ("cross", lambda: la.cross(lb), lambda: a.cross(b)),
+        ("cross out=", None, lambda: a.cross(b, out)),
+        ("normalized", lambda: la.normalized(), lambda: a.normalized()),
+        ("normalized out=", None, lambda: a.normalized(out)),
+        ("dot", lambda: la.dot(lb), lambda: a.dot(b)),
+        ("transform_point", lambda: _array_transform_point(m, la), lambda: m.transform_point(a)),
+        ("transform_point out=", None, lambda: m.transform_point(a, out)),
+        ("matmul", None, lambda: m @ m),
+        ("matmul out=", None, lambda: m.matmul(m, product)),
+        ("transform_points 1k", None, lambda: m.transform_points(points)),
+        ("  out=(N,3)", None, lambda: m.transform_points(points, points_out)),
+        ("  out=(N,4)", None, lambda: m.transform_points(points, points_work)),
+        ("view matrix", lambda: _array_view_matrix(la, lb, legacy_up), rebuild_view),
+    ]
+
+    print(f"{'op':<22}{'array ns':>10}{'B/op':>8}{'float ns':>11}{'B/op':>8}{'speedup':>9}")
+    for name, legacy, current in cases:
+        ns, peak = measure(current, args.iterations)
+        if legacy is None:
+            print(f"{name:<22}{'':>18}{ns:11.0f}{peak:8.0f}")
+            continue
+        legacy_ns, legacy_peak = measure(legacy, args.iterations)
+        print(f"{name:<22}{legacy_ns:10.0f}{legacy_peak:8.0f}{ns:11.0f}{peak:8.0f}{legacy_ns / ns:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import numpy as np
 import math
+from typing import Optional
 from core.vector import Vector3
 
 class Matrix4:
@@ -9,6 +10,13 @@ class Matrix4:
         m = np.array(m, dtype=float)
         assert m.shape == (4, 4), "Matrix must be 4x4"
         self._m = m
+
+    @classmethod
+    def _wrap(cls, m: np.ndarray) -> "Matrix4":
+        # Adopt a freshly computed (4,4) float array without copying or checking it
+        matrix = cls.__new__(cls)
+        matrix._m = m
+        return matrix
         
     @classmethod
     def identity(cls):
@@ -75,22 +83,106 @@ class Matrix4:
         return cls(m)
     
     def __matmul__(self, other: "Matrix4") -> "Matrix4":
-        return Matrix4(self._m @ other._m)
+        return Matrix4._wrap(self._m @ other._m)
+
+    @staticmethod
+    def scratch() -> "Matrix4":
+        """
+        An identity matrix owned by the caller. Only scratch matrices can be
+        written in place (matmul's out, set), so the matrices that caches
+        hand out (SceneNode, Camera, Transform) can never be.
+        """
+        return _ScratchMatrix4._wrap(np.eye(4))
+
+    def matmul(self, other: "Matrix4", out: Optional["Matrix4"] = None) -> "Matrix4":
+        """self @ other, written into out's storage when given; out must be scratch."""
+        if out is None:
+            return self @ other
+        if not isinstance(out, _ScratchMatrix4):
+            raise TypeError("out must be a matrix from Matrix4.scratch()")
+        np.matmul(self._m, other._m, out=out._m)
+        return out
+
+    def set(self, m) -> "Matrix4":
+        """Overwrite the elements in place; only scratch matrices allow this."""
+        raise TypeError("Only matrices from Matrix4.scratch() can be set in place")
     
-    def transform_point(self, v: Vector3) -> Vector3:
-        vec4 = np.array([v.x, v.y, v.z, 1.0], dtype=float)
-        res4 = self._m @ vec4
-        w = res4[3]
+    def transform_point(self, v: Vector3, out: Optional[Vector3] = None) -> Vector3:
+        # One conversion to Python floats, then plain float math
+        (m00, m01, m02, m03), (m10, m11, m12, m13), (m20, m21, m22, m23), (m30, m31, m32, m33) = self._m.tolist()
+        x, y, z = v.x, v.y, v.z
+        rx = m00*x + m01*y + m02*z + m03
+        ry = m10*x + m11*y + m12*z + m13
+        rz = m20*x + m21*y + m22*z + m23
+        w  = m30*x + m31*y + m32*z + m33
         if w != 0 and w != 1:
-            return Vector3(res4[0]/w, res4[1]/w, res4[2]/w)
-        return Vector3(res4[0], res4[1], res4[2])
+            rx, ry, rz = rx/w, ry/w, rz/w
+        if out is None:
+            return Vector3(rx, ry, rz)
+        return out._set(rx, ry, rz)
     
+    def transform_points(self, points: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Transform an (N,3) point array, including the perspective divide.
+
+        Vectorized transform_point: every row is transformed exactly once and
+        divided by its w unless w is 0. out may be a preallocated (N,3)
+        array (then only w is allocated), or an (N,4) array to work in: the
+        result is then its view out[:, :3] and nothing is allocated unless
+        some w is 0.
+        """
+        if out is None or out.shape[-1] == 4:
+            res4 = self.transform_points_homogeneous(points, out)
+            xyz, w = res4[:, :3], res4[:, 3]
+        else:
+            # Straight into out; only w needs room of its own
+            points = np.asarray(points, dtype=float).reshape(-1, 3)
+            xyz = out
+            np.matmul(points, self._m[:3, :3].T, out=xyz)
+            for k in range(3):
+                xyz[:, k] += self._m[k, 3]
+            w = points @ self._m[3, :3]
+            w += self._m[3, 3]
+        if np.count_nonzero(w) != len(w):
+            np.copyto(w, 1.0, where=w == 0)
+        if out is None:
+            return xyz / w[:, None]
+        # Column by column: whole-array ufuncs on overlapping views buffer a copy
+        for k in range(3):
+            xyz[:, k] /= w
+        return xyz
+
+    def transform_points_homogeneous(self, points: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Transform an (N,3) point array to (N,4) homogeneous coordinates.
+
+        No divide is applied, so the result can be clipped against the view
+        volume before projecting. out may be a preallocated (N,4) array.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        if out is None:
+            return points @ self._m[:, :3].T + self._m[:, 3]
+        np.matmul(points, self._m[:, :3].T, out=out)
+        # Per column, since a broadcast add would go through a temporary buffer
+        for k in range(4):
+            out[:, k] += self._m[k, 3]
+        return out
+
     def to_array(self) -> np.ndarray:
         return self._m.copy()
     
     def __repr__(self):
         return f"Matrix4({self._m})"
-    
+
+
+class _ScratchMatrix4(Matrix4):
+    # Matrix4.scratch(): the only matrices that may be written in place
+    __slots__ = ()
+
+    def set(self, m) -> Matrix4:
+        self._m[...] = m
+        return self
+
 if __name__ == "__main__":
     from vector import Vector3
     from matrix import Matrix4
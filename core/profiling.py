@@ -0,0 +1,119 @@
+import functools
+import time
+from collections import defaultdict, deque
+from typing import Callable, Optional
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class _Stage:
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._profiler.stages[self._name] += time.perf_counter() - self._start
+        return False
+
+class Profiler:
+    """
+    Per-frame stage timers and counters with a ring buffer of past frames.
+
+    Disabled by default: stage() then hands back a shared no-op context
+    manager and count() returns immediately, so instrumented code pays
+    only a method call. Stage times are inclusive and accumulate when a
+    stage runs several times in one frame.
+    """
+    def __init__(self, history: int = 120, enabled: bool = False):
+        self.enabled = enabled
+        self.history: deque = deque(maxlen=history)
+        self.stages: defaultdict = defaultdict(float)
+        self.counters: defaultdict = defaultdict(int)
+        self._frame_start = time.perf_counter()
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def timed(self, name: Optional[str] = None) -> Callable:
+        """Decorator timing every call of a function as a stage."""
+        def decorate(fn: Callable) -> Callable:
+            stage_name = name or fn.__qualname__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Stage(self, stage_name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def count(self, name: str, n: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] += n
+
+    def end_frame(self) -> Optional[dict]:
+        """
+        Close the current frame: push {"frame_ms", "stages" (ms), "counters"}
+        into the history and start a new one. Returns the finished record,
+        or None while disabled.
+        """
+        now = time.perf_counter()
+        record = None
+        if self.enabled:
+            record = {
+                "frame_ms": (now - self._frame_start) * 1000.0,
+                "stages": {k: v * 1000.0 for k, v in self.stages.items()},
+                "counters": dict(self.counters),
+            }
+            self.history.append(record)
+        self.stages.clear()
+        self.counters.clear()
+        self._frame_start = now
+        return record
+
+    def last(self) -> Optional[dict]:
+        return self.history[-1] if self.history else None
+
+    def average(self) -> dict:
+        """Mean frame time, stage times and counters over the history."""
+        n = len(self.history)
+        if n == 0:
+            return {"frame_ms": 0.0, "stages": {}, "counters": {}}
+        stages: defaultdict = defaultdict(float)
+        counters: defaultdict = defaultdict(float)
+        for record in self.history:
+            for k, v in record["stages"].items():
+                stages[k] += v / n
+            for k, v in record["counters"].items():
+                counters[k] += v / n
+        return {
+            "frame_ms": sum(r["frame_ms"] for r in self.history) / n,
+            "stages": dict(stages),
+            "counters": dict(counters),
+        }
+
+    def reset(self) -> None:
+        self.history.clear()
+        self.stages.clear()
+        self.counters.clear()
+        self._frame_start = time.perf_counter()
+
+# Shared instance used by the renderer, scene graph and window
+profiler = Profiler()
@@ -60,14 +60,122 @@ class Quaternion:
         ]))
 
     def rotate_vector(self, v: Vector3) -> Vector3:
-        # Rotate a Vector3: q * (0, v) * q⁻¹
-        qv = Quaternion(0, v.x, v.y, v.z)
-        qr = self * qv * self.conjugate()
-        return Vector3(qr.x, qr.y, qr.z)
+        # q * (0, v) * q⁻¹ expanded for a unit quaternion:
+        # v + w*t + u × t with t = 2 u × v, no temporary quaternions
+        w, x, y, z = self.w, self.x, self.y, self.z
+        vx, vy, vz = v.x, v.y, v.z
+        tx = 2.0 * (y*vz - z*vy)
+        ty = 2.0 * (z*vx - x*vz)
+        tz = 2.0 * (x*vy - y*vx)
+        return Vector3(
+            vx + w*tx + (y*tz - z*ty),
+            vy + w*ty + (z*tx - x*tz),
+            vz + w*tz + (x*ty - y*tx),
+        )
+
+    def to_array(self) -> np.ndarray:
+        return np.array([self.w, self.x, self.y, self.z])
+
+    @classmethod
+    def from_array(cls, q: np.ndarray) -> "Quaternion":
+        return cls(*q)
 
     def __repr__(self) -> str:
         return f"Quaternion(w={self.w:.3f}, x={self.x:.3f}, y={self.y:.3f}, z={self.z:.3f})"
 
+
+# ---- batched functions ----
+#
+# Quaternion arrays are (..., 4) float arrays in (w, x, y, z) order, the same
+# order as Quaternion. Leading dimensions broadcast like ordinary NumPy math.
+
+def multiply(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Hamilton product a * b, no normalization."""
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    w1, x1, y1, z1 = np.moveaxis(a, -1, 0)
+    w2, x2, y2, z2 = np.moveaxis(b, -1, 0)
+    return np.stack([
+        w1*w2 - x1*x2 - y1*y2 - z1*z2,
+        w1*x2 + x1*w2 + y1*z2 - z1*y2,
+        w1*y2 - x1*z2 + y1*w2 + z1*x2,
+        w1*z2 + x1*y2 - y1*x2 + z1*w2,
+    ], axis=-1)
+
+def normalize(q: np.ndarray) -> np.ndarray:
+    q = np.asarray(q, dtype=float)
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+def conjugate(q: np.ndarray) -> np.ndarray:
+    return np.asarray(q, dtype=float) * np.array([1.0, -1.0, -1.0, -1.0])
+
+def from_axis_angles(axes: np.ndarray, angles_degrees: np.ndarray) -> np.ndarray:
+    """Batched Quaternion.from_axis_angle for (...,3) axes and (...) angles."""
+    axes = np.asarray(axes, dtype=float)
+    axes = axes / np.linalg.norm(axes, axis=-1, keepdims=True)
+    theta = np.radians(np.asarray(angles_degrees, dtype=float)) / 2
+    return np.concatenate([np.cos(theta)[..., None], axes * np.sin(theta)[..., None]], axis=-1)
+
+def to_rotation_matrices(q: np.ndarray) -> np.ndarray:
+    """(...,3,3) rotation matrices of unit quaternions."""
+    w, x, y, z = np.moveaxis(np.asarray(q, dtype=float), -1, 0)
+    xx, yy, zz = x*x, y*y, z*z
+    xy, xz, yz = x*y, x*z, y*z
+    wx, wy, wz = w*x, w*y, w*z
+    return np.stack([
+        np.stack([1 - 2*(yy + zz), 2*(xy - wz),     2*(xz + wy)],     axis=-1),
+        np.stack([2*(xy + wz),     1 - 2*(xx + zz), 2*(yz - wx)],     axis=-1),
+        np.stack([2*(xz - wy),     2*(yz + wx),     1 - 2*(xx + yy)], axis=-1),
+    ], axis=-2)
+
+def to_matrices(q: np.ndarray) -> np.ndarray:
+    """(...,4,4) homogeneous rotation matrices, batched Quaternion.to_matrix4."""
+    rot = to_rotation_matrices(q)
+    out = np.zeros(rot.shape[:-2] + (4, 4))
+    out[..., :3, :3] = rot
+    out[..., 3, 3] = 1.0
+    return out
+
+def rotate_points(q: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """
+    Rotate (...,3) points by unit quaternions, batched rotate_vector. A
+    single (4,) quaternion rotates a whole (N,3) array; (K,4) with (K,3)
+    rotates pairwise; (K,1,4) with (N,3) gives (K,N,3).
+    """
+    q = np.asarray(q, dtype=float)
+    points = np.asarray(points, dtype=float)
+    w, u = q[..., :1], q[..., 1:]
+    t = 2.0 * np.cross(u, points)
+    return points + w * t + np.cross(u, t)
+
+def nlerp(a: np.ndarray, b: np.ndarray, t) -> np.ndarray:
+    """Normalized linear interpolation along the shorter arc."""
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    t = np.asarray(t, dtype=float)[..., None]
+    b = np.where((a * b).sum(axis=-1, keepdims=True) < 0.0, -b, b)
+    return normalize(a + t * (b - a))
+
+def slerp(a: np.ndarray, b: np.ndarray, t) -> np.ndarray:
+    """
+    Spherical linear interpolation along the shorter arc; nearly parallel
+    pairs fall back to nlerp where the sine weights lose precision.
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    t = np.asarray(t, dtype=float)[..., None]
+    dot = (a * b).sum(axis=-1, keepdims=True)
+    b = np.where(dot < 0.0, -b, b)
+    dot = np.minimum(np.abs(dot), 1.0)
+
+    theta = np.arccos(dot)
+    sin_theta = np.sin(theta)
+    close = dot > 0.9995
+    safe = np.where(close, 1.0, sin_theta)
+    wa = np.where(close, 1.0 - t, np.sin((1.0 - t) * theta) / safe)
+    wb = np.where(close, t, np.sin(t * theta) / safe)
+    return normalize(wa * a + wb * b)
+
 if __name__ == "__main__":
     from vector import Vector3
     from quaternion import Quaternion
@@ -1,51 +1,127 @@
 import numpy as np
 import math
+from operator import attrgetter
+from typing import Optional
 
 class Vector3:
-    __slots__ = ("_v",)
-    
+    """
+    3D vector stored as three plain floats.
+
+    For 3-element math, NumPy call overhead dwarfs the arithmetic, so every
+    operation here is straight float math with no temporary arrays.
+    Components are read-only and operators return new vectors, so a vector
+    held by a Transform or Camera cannot change behind its cache. The one
+    exception is out=: methods taking it write their result into that
+    vector instead of allocating one, and out must come from
+    Vector3.scratch() (anything else raises TypeError). Transform and
+    Camera store copies of scratch vectors, so writing into one never
+    reaches their state. Use arrays (Matrix4.transform_points,
+    core.quaternion) for bulk data.
+    """
+    __slots__ = ("_x", "_y", "_z")
+
     def __init__(self, x: float, y: float, z: float):
-        self._v = np.array([x,y,z], dtype=float)
-    
-    @property
-    def x(self) -> float:
-        return self._v[0]
-    
-    @property
-    def y(self) -> float:
-        return self._v[1]
-    
-    @property
-    def z(self) -> float:
-        return self._v[2]
-    
+        self._x = float(x)
+        self._y = float(y)
+        self._z = float(z)
+
+    x = property(attrgetter("_x"))
+    y = property(attrgetter("_y"))
+    z = property(attrgetter("_z"))
+
+    @classmethod
+    def from_array(cls, a) -> "Vector3":
+        return cls(a[0], a[1], a[2])
+
+    @staticmethod
+    def scratch() -> "Vector3":
+        """A zero vector owned by the caller, for out= arguments."""
+        return _ScratchVector3(0.0, 0.0, 0.0)
+
+    def _set(self, x: float, y: float, z: float) -> "Vector3":
+        # Write an out= result; only scratch vectors accept one
+        raise TypeError("out= must be a vector from Vector3.scratch()")
+
+    def _frozen(self) -> "Vector3":
+        # The vector to keep when storing this one (a copy if it is scratch)
+        return self
+
+    def copy(self) -> "Vector3":
+        return Vector3(self._x, self._y, self._z)
+
     def __add__(self, other: "Vector3") -> "Vector3":
-        return Vector3(*(self._v + other._v))
-    
+        return Vector3(self._x + other._x, self._y + other._y, self._z + other._z)
+
     def __sub__(self, other: "Vector3") -> "Vector3":
-        return Vector3(*(self._v - other._v))
-    
+        return Vector3(self._x - other._x, self._y - other._y, self._z - other._z)
+
     def __mul__(self, scalar: float) -> "Vector3":
-        return Vector3(*(self._v * scalar))
-    
+        return Vector3(self._x * scalar, self._y * scalar, self._z * scalar)
+
+    __rmul__ = __mul__
+
+    def __neg__(self) -> "Vector3":
+        return Vector3(-self._x, -self._y, -self._z)
+
+    def __iter__(self):
+        yield self._x
+        yield self._y
+        yield self._z
+
+    def add(self, other: "Vector3", out: Optional["Vector3"] = None) -> "Vector3":
+        if out is None:
+            return self + other
+        return out._set(self._x + other._x, self._y + other._y, self._z + other._z)
+
+    def sub(self, other: "Vector3", out: Optional["Vector3"] = None) -> "Vector3":
+        if out is None:
+            return self - other
+        return out._set(self._x - other._x, self._y - other._y, self._z - other._z)
+
+    def scale(self, scalar: float, out: Optional["Vector3"] = None) -> "Vector3":
+        if out is None:
+            return self * scalar
+        return out._set(self._x * scalar, self._y * scalar, self._z * scalar)
+
     def dot(self, other: "Vector3") -> float:
-        return float(self._v @ other._v)
-    
-    def cross(self, other: "Vector3") -> "Vector3":
-        return Vector3(*np.cross(self._v, other._v))
-    
+        return self._x * other._x + self._y * other._y + self._z * other._z
+
+    def cross(self, other: "Vector3", out: Optional["Vector3"] = None) -> "Vector3":
+        # Read everything first so out may alias self or other
+        ax, ay, az = self._x, self._y, self._z
+        bx, by, bz = other._x, other._y, other._z
+        x = ay * bz - az * by
+        y = az * bx - ax * bz
+        z = ax * by - ay * bx
+        if out is None:
+            return Vector3(x, y, z)
+        return out._set(x, y, z)
+
     def length(self) -> float:
-        x, y, z = self._v
+        x, y, z = self._x, self._y, self._z
         return math.sqrt(x*x + y*y + z*z)
-    
-    def normalized(self) -> "Vector3":
+
+    def normalized(self, out: Optional["Vector3"] = None) -> "Vector3":
         norm = self.length()
-        if norm:
-            return Vector3(*(self._v / norm))
-        return Vector3(0.0, 0.0, 0.0)
-    
+        inv = 1.0 / norm if norm else 0.0
+        return self.scale(inv, out)
+
     def to_array(self) -> np.ndarray:
-        return self._v.copy()
-    
+        return np.array([self._x, self._y, self._z])
+
     def __repr__(self):
-        return f"Vector3({self.x}, {self.y}, {self.z})"
\ No newline at end of file
+        return f"Vector3({self._x}, {self._y}, {self._z})"
+
+
+class _ScratchVector3(Vector3):
+    # Vector3.scratch(): the only vectors out= may write into
+    __slots__ = ()
+
+    def _set(self, x: float, y: float, z: float) -> Vector3:
+        self._x = x
+        self._y = y
+        self._z = z
+        return self
+
+    def _frozen(self) -> Vector3:
+        return Vector3(self._x, self._y, self._z)
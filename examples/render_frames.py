@@ -0,0 +1,54 @@
+# examples/render_frames.py
+#
+# Headless batch render of the rotating cube, no display required:
+#   python -m examples.render_frames --frames 120 --format png --out frames
+#   python -m examples.render_frames --format raw --out - | ffmpeg -f rawvideo -pix_fmt rgb24 -s 800x600 -r 60 -i - cube.mp4
+import argparse
+import math
+import sys
+
+from core.vector       import Vector3
+from core.quaternion   import Quaternion
+from render.export     import FORMATS, FrameWriter, render_sequence
+from render.pipeline   import render_mesh
+from render.rasterizer import Rasterizer
+from render.target     import RenderTarget
+from scene.camera      import Camera
+from scene.mesh        import Mesh
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the rotating cube to image files or a pipe")
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--height", type=int, default=600)
+    parser.add_argument("--fps", type=float, default=60.0)
+    parser.add_argument("--format", choices=FORMATS, default="png")
+    parser.add_argument("--out", default="frames", help="directory, raw file, or - for stdout")
+    args = parser.parse_args()
+
+    target = RenderTarget(args.width, args.height)
+    raster = Rasterizer(args.width, args.height)
+    cube   = Mesh.create_cube(1.0)
+    cam = Camera(
+        position=Vector3(0, 0, 5),
+        target=  Vector3(0, 0, 0),
+        up=      Vector3(0, 1, 0),
+        fov=     math.radians(60),
+        aspect=  args.width / args.height,
+        near=    0.1,
+        far=     100.0,
+    )
+    VP = cam.get_view_projection_matrix()
+
+    def draw_frame(target: RenderTarget, index: int) -> None:
+        t = index / args.fps
+        q = (Quaternion.from_axis_angle(Vector3(0, 0, 1), 60 * t)
+             * Quaternion.from_axis_angle(Vector3(0, 1, 0), 45 * t)
+             * Quaternion.from_axis_angle(Vector3(1, 0, 0), 30 * t))
+        render_mesh(raster, cube, VP @ q.to_matrix4(), target.framebuffer, target.depthbuffer)
+
+    out = sys.stdout.buffer if args.out == "-" else args.out
+    render_sequence(target, draw_frame, args.frames, FrameWriter(out, args.format), (20, 20, 20))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# render/clipping.py
+
+import numpy as np
+from typing import Optional
+from core.profiling import profiler
+
+# Clip-space planes as (a, b, c, d): a point is inside when a*x + b*y + c*z + d*w >= 0
+NEAR_PLANE = np.array([0.0, 0.0, 1.0, 1.0])  # z >= -w
+
+def guard_band_planes(guard: float) -> list[np.ndarray]:
+    """
+    Left/right/bottom/top planes at guard times the viewport extent. Only
+    triangles crossing these get clipped; everything between the viewport
+    and the guard band is left to the rasterizer's bounding-box clamp.
+    """
+    return [
+        np.array([ 1.0,  0.0, 0.0, guard]),
+        np.array([-1.0,  0.0, 0.0, guard]),
+        np.array([ 0.0,  1.0, 0.0, guard]),
+        np.array([ 0.0, -1.0, 0.0, guard]),
+    ]
+
+def clip_triangles(
+    clip: np.ndarray,
+    indices: np.ndarray,
+    guard_band: Optional[float] = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sutherland-Hodgman clip an indexed triangle batch in clip space against
+    the near plane (and the guard band when given).
+
+    clip is (N,4) homogeneous positions and indices (M,3). Returns
+    (clip (N',4), indices (M',3), face_ids (M',)) where face_ids maps each
+    output triangle to the input face it came from. Triangles entirely
+    inside keep their vertices; only triangles crossing a plane produce new
+    vertices, appended after the original ones.
+    """
+    planes = [NEAR_PLANE]
+    if guard_band is not None:
+        planes += guard_band_planes(guard_band)
+
+    clip = np.asarray(clip, dtype=float)
+    indices = np.asarray(indices, dtype=np.int64).reshape(-1, 3)
+    face_ids = np.arange(len(indices))
+    for plane in planes:
+        clip, indices, face_ids = clip_plane(clip, indices, face_ids, plane)
+    return clip, indices, face_ids
+
+def clip_plane(
+    clip: np.ndarray,
+    indices: np.ndarray,
+    face_ids: np.ndarray,
+    plane: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Clip a batch against one plane. Winding and submission order of unclipped triangles are kept."""
+    dist = clip @ plane
+    inside = (dist >= 0.0)[indices]
+    n_in = inside.sum(axis=1)
+    if (n_in == 3).all():
+        return clip, indices, face_ids
+
+    keep = n_in == 3
+    one = np.flatnonzero(n_in == 1)
+    two = np.flatnonzero(n_in == 2)
+    profiler.count("triangles_clipped", len(one) + len(two))
+    # Kept apart from the rasterizer's triangles_culled (back faces, zero area)
+    profiler.count("triangles_clipped_away", int(np.count_nonzero(n_in == 0)))
+
+    # Rotate each triangle so the odd vertex out (the lone inside one, or
+    # the lone outside one) comes first; cyclic rotation keeps the winding.
+    def rotated(tris, odd):
+        k = np.argmax(odd, axis=1)
+        cols = (k[:, None] + np.arange(3)) % 3
+        return np.take_along_axis(tris, cols, axis=1)
+
+    def intersect(a, b):
+        # Point where edge a->b crosses the plane
+        da, db = dist[a], dist[b]
+        t = (da / (da - db))[:, None]
+        return clip[a] + t * (clip[b] - clip[a])
+
+    new_verts = []
+    new_tris = []
+    new_ids = []
+    base = len(clip)
+
+    if len(one):
+        a, b, c = rotated(indices[one], inside[one]).T
+        ab, ac = intersect(a, b), intersect(a, c)
+        n = len(one)
+        i_ab = base + np.arange(n)
+        i_ac = base + n + np.arange(n)
+        new_verts += [ab, ac]
+        new_tris.append(np.stack([a, i_ab, i_ac], axis=1))
+        new_ids.append(face_ids[one])
+        base += 2 * n
+
+    if len(two):
+        a, b, c = rotated(indices[two], ~inside[two]).T
+        ab, ca = intersect(b, a), intersect(c, a)
+        n = len(two)
+        i_ab = base + np.arange(n)
+        i_ca = base + n + np.arange(n)
+        new_verts += [ab, ca]
+        # quad (ab, b, c, ca) split into two triangles
+        new_tris.append(np.stack([i_ab, b, c], axis=1))
+        new_tris.append(np.stack([i_ab, c, i_ca], axis=1))
+        new_ids += [face_ids[two], face_ids[two]]
+
+    clip = np.concatenate([clip, *new_verts]) if new_verts else clip
+    indices = np.concatenate([indices[keep], *new_tris])
+    face_ids = np.concatenate([face_ids[keep], *new_ids])
+    return clip, indices, face_ids
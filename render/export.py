@@ -0,0 +1,144 @@
+# render/export.py
+
+import os
+import queue
+import struct
+import threading
+import zlib
+import numpy as np
+from typing import BinaryIO, Callable, Optional, Union
+from render.target import RenderTarget
+
+FORMATS = ("png", "npy", "raw")
+
+class FrameWriter:
+    """
+    Writes rendered frames on a background thread so encoding and disk I/O
+    overlap with rendering the next frame.
+
+    "png" and "npy" write one file per frame into a directory; "raw" appends
+    packed RGB24 frames to a single file or to a binary stream such as a
+    pipe into ffmpeg (-f rawvideo -pix_fmt rgb24 -s WxH -i -). The queue is
+    bounded, so a slow writer throttles the renderer instead of buffering
+    frames without limit.
+    """
+    def __init__(
+        self,
+        output: Union[str, os.PathLike, BinaryIO],
+        fmt: str = "png",
+        queue_size: int = 8,
+        png_level: int = 6,
+    ):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown frame format {fmt!r}, expected one of {FORMATS}")
+        self.fmt = fmt
+        self.png_level = png_level
+        self._stream: Optional[BinaryIO] = None
+        self._owns_stream = False
+        self._dir = None
+        if fmt == "raw":
+            if hasattr(output, "write"):
+                self._stream = output
+            else:
+                self._stream = open(output, "wb")
+                self._owns_stream = True
+        else:
+            self._dir = os.fspath(output)
+            os.makedirs(self._dir, exist_ok=True)
+
+        self.frames_written = 0
+        self._error: Optional[BaseException] = None
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="FrameWriter", daemon=True)
+        self._thread.start()
+
+    def write(self, index: int, framebuffer: np.ndarray) -> None:
+        """Queue a copy of framebuffer, which the caller may then reuse."""
+        self._check()
+        self._queue.put((index, framebuffer.copy()))
+
+    def close(self) -> None:
+        """Wait for queued frames to be written, then release the output."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._owns_stream:
+            self._stream.close()
+        elif self._stream is not None:
+            self._stream.flush()
+        self._check()
+
+    def __enter__(self) -> "FrameWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _check(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Frame writer failed") from error
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error is not None:
+                continue  # keep draining so the renderer never blocks
+            index, frame = item
+            try:
+                self._write_frame(index, frame)
+                self.frames_written += 1
+            except BaseException as exc:
+                self._error = exc
+
+    def _write_frame(self, index: int, frame: np.ndarray) -> None:
+        if self.fmt == "raw":
+            self._stream.write(frame.tobytes())
+            return
+        path = os.path.join(self._dir, f"frame_{index:05d}.{self.fmt}")
+        if self.fmt == "npy":
+            np.save(path, frame)
+        else:
+            with open(path, "wb") as f:
+                f.write(encode_png(frame, self.png_level))
+
+
+def encode_png(rgb: np.ndarray, level: int = 6) -> bytes:
+    """Encode an (H,W,3) uint8 image as PNG using only zlib."""
+    height, width = rgb.shape[:2]
+    # Every scanline starts with filter type 0 (none)
+    rows = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 0] = 0
+    rows[:, 1:] = rgb.reshape(height, width * 3)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        body = tag + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(rows.tobytes(), level))
+        + chunk(b"IEND", b"")
+    )
+
+def render_sequence(
+    target: RenderTarget,
+    draw_frame: Callable[[RenderTarget, int], None],
+    frames: int,
+    writer: FrameWriter,
+    clear_color: tuple[int, int, int] = (0, 0, 0),
+) -> None:
+    """
+    Batch mode: for each frame index, clear the target, call
+    draw_frame(target, index) to render into it and hand the framebuffer
+    to the writer. Closes the writer once every frame is written.
+    """
+    with writer:
+        for index in range(frames):
+            target.clear(clear_color)
+            draw_frame(target, index)
+            writer.write(index, target.framebuffer)
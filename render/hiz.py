@@ -0,0 +1,136 @@
+# render/hiz.py
+
+import numpy as np
+
+# Slack on the occlusion test so float rounding in the interpolated depth can
+# never make a rejected triangle differ from what the per-pixel test would do
+EPSILON = 1e-9
+
+class HiZBuffer:
+    """
+    Coarse hierarchical Z buffer kept alongside a depthbuffer.
+
+    Level 0 stores the farthest depth in every tile_size x tile_size tile,
+    and each further level the farthest of 2x2 cells below it, up to a
+    single cell. Anything whose nearest depth is not in front of that bound
+    cannot pass the per-pixel depth test and is rejected before rasterizing.
+
+    Depth only ever decreases while drawing, so a pyramid that lags behind
+    the depthbuffer stays conservative; it merely rejects less. It must be
+    cleared whenever the depthbuffer is.
+    """
+    def __init__(self, width: int, height: int, tile_size: int = 8):
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+
+        shapes = [(-(-height // tile_size), -(-width // tile_size))]
+        while shapes[-1] != (1, 1):
+            h, w = shapes[-1]
+            shapes.append((-(-h // 2), -(-w // 2)))
+        # All levels are views into one flat array so lookups at mixed
+        # levels can be gathered in a single indexing operation
+        sizes = [h * w for h, w in shapes]
+        self._flat = np.full(sum(sizes), np.inf, dtype=np.float32)
+        self._offsets = np.cumsum([0] + sizes[:-1])
+        self._widths = np.array([w for _, w in shapes], dtype=np.int64)
+        self._heights = np.array([h for h, _ in shapes], dtype=np.int64)
+        self.levels = [
+            self._flat[o:o + s].reshape(shape)
+            for o, s, shape in zip(self._offsets, sizes, shapes)
+        ]
+
+    def clear(self) -> None:
+        self._flat[:] = np.inf
+
+    def update(self, depthbuffer: np.ndarray, min_x: int = 0, max_x: int = None,
+               min_y: int = 0, max_y: int = None) -> None:
+        """
+        Rebuild the tiles covering the pixel rectangle [min_x, max_x] x
+        [min_y, max_y] (the whole buffer by default) from the depthbuffer.
+        """
+        ts = self.tile_size
+        max_x = self.width - 1 if max_x is None else max_x
+        max_y = self.height - 1 if max_y is None else max_y
+        tx0, tx1 = min_x // ts, max_x // ts
+        ty0, ty1 = min_y // ts, max_y // ts
+
+        region = depthbuffer[ty0 * ts:(ty1 + 1) * ts, tx0 * ts:(tx1 + 1) * ts]
+        self.levels[0][ty0:ty1 + 1, tx0:tx1 + 1] = _reduce_max(region, ts)
+        for below, level in zip(self.levels, self.levels[1:]):
+            tx0, tx1, ty0, ty1 = tx0 // 2, tx1 // 2, ty0 // 2, ty1 // 2
+            cells = below[ty0 * 2:(ty1 + 1) * 2, tx0 * 2:(tx1 + 1) * 2]
+            level[ty0:ty1 + 1, tx0:tx1 + 1] = _reduce_max(cells, 2)
+
+    def farthest(self, min_x, max_x, min_y, max_y) -> np.ndarray:
+        """
+        Conservative farthest stored depth over each (clamped) pixel box.
+
+        Every box is looked up at the coarsest level where it spans at most
+        2x2 cells, so the cost is four reads per box whatever its size.
+        """
+        ts = self.tile_size
+        tx0, tx1 = np.asarray(min_x) // ts, np.asarray(max_x) // ts
+        ty0, ty1 = np.asarray(min_y) // ts, np.asarray(max_y) // ts
+        span = np.maximum(tx1 - tx0, ty1 - ty0)
+        # Smallest level l with span <= 2**l
+        level = np.ceil(np.log2(np.maximum(span, 1))).astype(np.int64)
+        level = np.minimum(level, len(self.levels) - 1)
+
+        base = self._offsets[level]
+        width = self._widths[level]
+        cx0, cx1 = tx0 >> level, tx1 >> level
+        cy0, cy1 = ty0 >> level, ty1 >> level
+        flat = self._flat
+        return np.maximum(
+            np.maximum(flat[base + cy0 * width + cx0], flat[base + cy0 * width + cx1]),
+            np.maximum(flat[base + cy1 * width + cx0], flat[base + cy1 * width + cx1]),
+        )
+
+    def visible(self, near_z, min_x, max_x, min_y, max_y) -> np.ndarray:
+        """Mask of boxes whose nearest depth near_z may still pass the depth test."""
+        return np.asarray(near_z) - EPSILON < self.farthest(min_x, max_x, min_y, max_y)
+
+    def visible_bands(self, near_z: float, min_x: int, max_x: int, min_y: int, max_y: int):
+        """
+        Split one large box into horizontal bands covering only its tiles
+        that are not fully occluded. Returns a list of (min_x, max_x, min_y,
+        max_y) pixel rectangles; consecutive tile rows are merged into one
+        band so an unoccluded triangle is still filled in a single call.
+        """
+        ts = self.tile_size
+        tx0, tx1 = min_x // ts, max_x // ts
+        ty0, ty1 = min_y // ts, max_y // ts
+        open_tiles = self.levels[0][ty0:ty1 + 1, tx0:tx1 + 1] > near_z - EPSILON
+
+        bands = []
+        band = None
+        for row, tiles in enumerate(open_tiles):
+            cols = np.flatnonzero(tiles)
+            if cols.size == 0:
+                band = None
+                continue
+            x0 = max((tx0 + int(cols[0])) * ts, min_x)
+            x1 = min((tx0 + int(cols[-1]) + 1) * ts - 1, max_x)
+            y0 = max((ty0 + row) * ts, min_y)
+            y1 = min((ty0 + row + 1) * ts - 1, max_y)
+            if band is None:
+                band = [x0, x1, y0, y1]
+                bands.append(band)
+            else:
+                band[0] = min(band[0], x0)
+                band[1] = max(band[1], x1)
+                band[3] = y1
+        return [tuple(b) for b in bands]
+
+
+def _reduce_max(a: np.ndarray, factor: int) -> np.ndarray:
+    # Max over factor x factor blocks; partial blocks at the edges only see
+    # the cells they actually contain
+    h, w = a.shape
+    bh, bw = -(-h // factor), -(-w // factor)
+    if (h, w) != (bh * factor, bw * factor):
+        padded = np.full((bh * factor, bw * factor), -np.inf, dtype=a.dtype)
+        padded[:h, :w] = a
+        a = padded
+    return a.reshape(bh, factor, bw, factor).max(axis=(1, 3))
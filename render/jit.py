@@ -0,0 +1,197 @@
+# render/jit.py
+"""
+Compiled raster kernels, used when Numba is installed.
+
+AVAILABLE says whether they are; without Numba this module defines nothing
+else and the rasterizer keeps its NumPy paths. The kernels repeat the
+NumPy arithmetic in the same order, so the "jit" raster mode draws the same
+pixels with the same depths. Compiled code is cached next to this file, so
+only the first run after a change pays for compilation.
+"""
+import os
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+AVAILABLE = numba is not None
+
+# Rows per parallel band; bands cover disjoint pixels, so they need no locking
+BAND_ROWS = 16
+
+if AVAILABLE:
+    @numba.njit(cache=True)
+    def _setup(positions, indices, cull_backfaces, width, height):
+        # Rasterizer.setup_triangles for a whole index buffer
+        count = indices.shape[0]
+        tris = np.empty((count, 3, 3))
+        faces = np.empty(count, dtype=np.int64)
+        inv_area = np.empty(count)
+        boxes = np.empty((4, count), dtype=np.int64)
+        kept = 0
+        for f in range(count):
+            i0, i1, i2 = indices[f, 0], indices[f, 1], indices[f, 2]
+            area = ((positions[i2, 0] - positions[i0, 0]) * (positions[i1, 1] - positions[i0, 1])
+                    - (positions[i2, 1] - positions[i0, 1]) * (positions[i1, 0] - positions[i0, 0]))
+            if area < 0 and not cull_backfaces:
+                i1, i2 = i2, i1
+                area = ((positions[i2, 0] - positions[i0, 0]) * (positions[i1, 1] - positions[i0, 1])
+                        - (positions[i2, 1] - positions[i0, 1]) * (positions[i1, 0] - positions[i0, 0]))
+            if not area >= 1e-6:
+                continue
+            x0, x1, x2 = positions[i0, 0], positions[i1, 0], positions[i2, 0]
+            y0, y1, y2 = positions[i0, 1], positions[i1, 1], positions[i2, 1]
+            min_x = max(np.floor(min(x0, x1, x2)), 0.0)
+            max_x = min(np.ceil(max(x0, x1, x2)), width - 1.0)
+            min_y = max(np.floor(min(y0, y1, y2)), 0.0)
+            max_y = min(np.ceil(max(y0, y1, y2)), height - 1.0)
+            if min_x > max_x or min_y > max_y:
+                continue
+            for k in range(3):
+                tris[kept, 0, k] = positions[i0, k]
+                tris[kept, 1, k] = positions[i1, k]
+                tris[kept, 2, k] = positions[i2, k]
+            faces[kept] = f
+            inv_area[kept] = 1.0 / area
+            boxes[0, kept] = min_x
+            boxes[1, kept] = max_x
+            boxes[2, kept] = min_y
+            boxes[3, kept] = max_y
+            kept += 1
+        return tris[:kept], faces[:kept], inv_area[:kept], boxes[:, :kept]
+
+    @numba.njit(cache=True)
+    def _fill(tris, t, color, inv_area, min_x, max_x, min_y, max_y, framebuffer, depthbuffer):
+        # One triangle over rows min_y..max_y; same arithmetic as _fill_triangle
+        v0x, v0y, v0z = tris[t, 0, 0], tris[t, 0, 1], tris[t, 0, 2]
+        v1x, v1y, v1z = tris[t, 1, 0], tris[t, 1, 1], tris[t, 1, 2]
+        v2x, v2y, v2z = tris[t, 2, 0], tris[t, 2, 1], tris[t, 2, 2]
+        pixels = 0
+        for y in range(min_y, max_y + 1):
+            py = y + 0.5
+            for x in range(min_x, max_x + 1):
+                px = x + 0.5
+                w0 = (px - v1x) * (v2y - v1y) - (py - v1y) * (v2x - v1x)
+                w1 = (px - v2x) * (v0y - v2y) - (py - v2y) * (v0x - v2x)
+                w2 = (px - v0x) * (v1y - v0y) - (py - v0y) * (v1x - v0x)
+                if w0 >= 0 and w1 >= 0 and w2 >= 0:
+                    z = (w0 * inv_area) * v0z + (w1 * inv_area) * v1z + (w2 * inv_area) * v2z
+                    if z < depthbuffer[y, x]:
+                        depthbuffer[y, x] = z
+                        framebuffer[y, x, 0] = color[0]
+                        framebuffer[y, x, 1] = color[1]
+                        framebuffer[y, x, 2] = color[2]
+                        pixels += 1
+        return pixels
+
+    @numba.njit(parallel=True, cache=True)
+    def _raster_bands(tris, colors, inv_area, boxes, framebuffer, depthbuffer):
+        # Every band walks all triangles in submission order and fills the
+        # rows it owns, so each pixel sees them in the same order as a
+        # serial loop would
+        bands = (framebuffer.shape[0] + BAND_ROWS - 1) // BAND_ROWS
+        pixels = np.zeros(bands, dtype=np.int64)
+        for band in numba.prange(bands):
+            top = band * BAND_ROWS
+            bottom = top + BAND_ROWS - 1
+            for t in range(tris.shape[0]):
+                min_y = max(boxes[2, t], top)
+                max_y = min(boxes[3, t], bottom)
+                if min_y <= max_y:
+                    pixels[band] += _fill(
+                        tris, t, colors[t], inv_area[t], boxes[0, t], boxes[1, t],
+                        min_y, max_y, framebuffer, depthbuffer,
+                    )
+        return pixels.sum()
+
+    @numba.njit(cache=True)
+    def _draw_indexed(positions, indices, colors, cull_backfaces, framebuffer, depthbuffer):
+        height, width = depthbuffer.shape
+        tris, faces, inv_area, boxes = _setup(positions, indices, cull_backfaces, width, height)
+        pixels = _raster_bands(tris, colors[faces], inv_area, boxes, framebuffer, depthbuffer)
+        return tris.shape[0], pixels
+
+
+def use_fork_safe_threading() -> bool:
+    """
+    Prepare Numba for forking worker processes; TiledRasterizer(processes=True)
+    calls this, nothing else touches Numba's process-wide configuration.
+
+    TBB's worker threads hang forked children at exit. If no parallel kernel
+    has run yet, the threading layer is set to the built-in work queue,
+    which forks cleanly (but must not run parallel kernels from several
+    threads at once). Set NUMBA_THREADING_LAYER to keep your own choice.
+    Returns False when another layer is already running, so workers should
+    be spawned rather than forked.
+    """
+    if not AVAILABLE or "NUMBA_THREADING_LAYER" in os.environ:
+        return True
+    try:
+        return numba.threading_layer() == "workqueue"
+    except ValueError:
+        # No parallel kernel has run, so the choice still takes effect
+        numba.config.THREADING_LAYER = "workqueue"
+        return True
+
+def _check_buffers(framebuffer, depthbuffer, max_x: int = -1, max_y: int = -1) -> None:
+    # Compiled code writes pixels without bounds or type checks, so anything
+    # NumPy indexing would reject has to be rejected here first
+    if not (isinstance(framebuffer, np.ndarray) and framebuffer.dtype == np.uint8
+            and framebuffer.ndim == 3 and framebuffer.shape[2] == 3):
+        raise TypeError("framebuffer must be an (H,W,3) uint8 array")
+    if not (isinstance(depthbuffer, np.ndarray) and depthbuffer.dtype in (np.float32, np.float64)
+            and depthbuffer.shape == framebuffer.shape[:2]):
+        raise TypeError("depthbuffer must be an (H,W) float32 or float64 array matching the framebuffer")
+    height, width = depthbuffer.shape
+    if max_x >= width or max_y >= height:
+        raise IndexError(f"triangle bounds reach past the {width}x{height} buffers")
+
+def draw_indexed(positions, indices, colors, framebuffer, depthbuffer, cull_backfaces: bool = True):
+    """
+    Set up, cull and fill a whole indexed triangle list in one compiled
+    call. Returns (triangles drawn, pixels that passed the depth test).
+    """
+    positions = np.ascontiguousarray(positions, dtype=np.float64)
+    indices = np.ascontiguousarray(indices, dtype=np.int64).reshape(-1, 3)
+    colors = np.ascontiguousarray(colors, dtype=np.uint8).reshape(-1, 3)
+    # The kernels don't bounds-check, so validate (and wrap negatives) here like NumPy indexing would
+    _check_buffers(framebuffer, depthbuffer)
+    if len(colors) != len(indices):
+        raise IndexError(f"{len(colors)} face colors for {len(indices)} triangles")
+    if indices.size:
+        low, high = int(indices.min()), int(indices.max())
+        if low < -len(positions) or high >= len(positions):
+            raise IndexError(f"vertex index out of range for {len(positions)} positions")
+        if low < 0:
+            indices = indices % len(positions)
+    drawn, pixels = _draw_indexed(positions, indices, colors, cull_backfaces, framebuffer, depthbuffer)
+    return int(drawn), int(pixels)
+
+def rasterize(tris, colors, inv_area, min_x, max_x, min_y, max_y, framebuffer, depthbuffer) -> int:
+    """Fill a batch prepared by Rasterizer.setup_triangles, in order."""
+    boxes = np.stack([min_x, max_x, min_y, max_y]).astype(np.int64).reshape(4, -1)
+    tris = np.ascontiguousarray(tris, dtype=np.float64).reshape(-1, 3, 3)
+    colors = np.ascontiguousarray(colors, dtype=np.uint8).reshape(-1, 3)
+    inv_area = np.ascontiguousarray(inv_area, dtype=np.float64).reshape(-1)
+    if not len(tris):
+        return 0
+    if not len(colors) == len(inv_area) == boxes.shape[1] == len(tris):
+        raise IndexError("triangles, colors, inverse areas and boxes differ in length")
+    if boxes[0].min() < 0 or boxes[2].min() < 0:
+        raise IndexError("triangle bounds start before the buffers")
+    _check_buffers(framebuffer, depthbuffer, int(boxes[1].max()), int(boxes[3].max()))
+    return int(_raster_bands(tris, colors, inv_area, boxes, framebuffer, depthbuffer))
+
+def fill_triangle(
+    v0x, v0y, v0z, v1x, v1y, v1z, v2x, v2y, v2z, inv_area,
+    min_x, max_x, min_y, max_y, color, framebuffer, depthbuffer,
+) -> int:
+    """Compiled _fill_triangle, for Rasterizer.draw_triangle."""
+    if min_x < 0 or min_y < 0:
+        raise IndexError("triangle bounds start before the buffers")
+    _check_buffers(framebuffer, depthbuffer, max_x, max_y)
+    tri = np.array([[[v0x, v0y, v0z], [v1x, v1y, v1z], [v2x, v2y, v2z]]])
+    color = np.asarray(color, dtype=np.uint8).reshape(3)
+    return int(_fill(tri, 0, color, float(inv_area), min_x, max_x, min_y, max_y, framebuffer, depthbuffer))
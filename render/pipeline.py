@@ -0,0 +1,245 @@
+# render/pipeline.py
+
+import numpy as np
+from collections import OrderedDict
+from typing import Optional
+from core.matrix import Matrix4
+from core.profiling import profiler
+from render.clipping import clip_triangles
+from render.hiz import HiZBuffer
+from render.rasterizer import Rasterizer
+from scene.frustum import Frustum
+
+def viewport(ndc: np.ndarray, width: int, height: int) -> np.ndarray:
+    """
+    Map (N,3) normalized device coordinates to screen space: x right, y
+    down, depth kept as NDC z in [-1,1].
+    """
+    screen = np.empty_like(ndc)
+    screen[:, 0] = (ndc[:, 0] * 0.5 + 0.5) * (width - 1)
+    screen[:, 1] = (1.0 - (ndc[:, 1] * 0.5 + 0.5)) * (height - 1)
+    screen[:, 2] = ndc[:, 2]
+    return screen
+
+def project(clip: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Perspective divide + viewport for (N,4) clip-space points."""
+    return viewport(clip[:, :3] / clip[:, 3:], width, height)
+
+def prepare_mesh(
+    mesh,
+    mvp: Matrix4,
+    width: int,
+    height: int,
+    guard_band: Optional[float] = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vertex stage for one mesh: transform every vertex once, clip the
+    triangles against the near plane (and guard band) in clip space and
+    project. Returns screen positions, indices and per-face colors ready
+    for Rasterizer.draw_mesh.
+    """
+    with profiler.stage("vertex"):
+        clip = mvp.transform_points_homogeneous(mesh.positions)
+    profiler.count("vertices_transformed", len(clip))
+    screen, indices, face_ids = _clip_project(clip, mesh.indices, width, height, guard_band)
+    return screen, indices, mesh.colors[face_ids]
+
+def prepare_instances(
+    mesh,
+    view_proj: Matrix4,
+    matrices: np.ndarray,
+    width: int,
+    height: int,
+    guard_band: Optional[float] = None,
+    instance_colors: Optional[np.ndarray] = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vertex stage for K instances of one mesh under (K,4,4) model matrices:
+    all K*N vertices are transformed by one batched matmul and the copies
+    are concatenated into a single indexed triangle list, so the result
+    goes to the rasterizer in one draw_mesh call. instance_colors (K,3)
+    replace the face colors per instance.
+    """
+    count, n = len(matrices), len(mesh.positions)
+    with profiler.stage("vertex"):
+        mvps = view_proj.to_array() @ matrices
+        positions = np.asarray(mesh.positions, dtype=float)
+        # Same arithmetic as Matrix4.transform_points_homogeneous, per instance
+        clip = (positions @ mvps[:, :, :3].transpose(0, 2, 1) + mvps[:, None, :, 3]).reshape(-1, 4)
+    profiler.count("vertices_transformed", len(clip))
+    indices = (mesh.indices[None] + (np.arange(count) * n)[:, None, None]).reshape(-1, 3)
+    screen, indices, face_ids = _clip_project(clip, indices, width, height, guard_band)
+    faces = len(mesh.indices)
+    if instance_colors is not None:
+        colors = np.asarray(instance_colors, dtype=np.uint8).reshape(-1, 3)[face_ids // faces]
+    else:
+        colors = mesh.colors[face_ids % faces]
+    return screen, indices, colors
+
+def _clip_project(clip, indices, width, height, guard_band):
+    with profiler.stage("clip"):
+        clip, indices, face_ids = clip_triangles(clip, indices, guard_band)
+    with profiler.stage("project"):
+        # Vertices only used by clipped-away triangles may sit behind the
+        # camera; give them a harmless w so the divide stays finite.
+        w = clip[:, 3:]
+        clip = clip / np.where(w > 0.0, w, 1.0)
+        screen = viewport(clip[:, :3], width, height)
+    return screen, indices, face_ids
+
+class VertexCache:
+    """
+    Post-transform vertex cache keyed by mesh.
+
+    Holds the prepare_mesh results (screen positions of the unique vertex
+    set, indices and colors) of the most recent draws, so drawing the same
+    mesh again with the same matrix and viewport (a static object, a second
+    pass such as a wireframe overlay, a paused animation) skips the vertex
+    stage entirely and triangle setup gathers straight from the cached
+    screen positions by index. Entries are dropped when the mesh's version
+    changes (see Mesh.invalidate_bounds) and least recently used first once
+    more than capacity meshes are cached.
+    """
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self,
+        mesh,
+        mvp: Matrix4,
+        width: int,
+        height: int,
+        guard_band: Optional[float] = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """prepare_mesh, answered from the cache when nothing changed."""
+        key = id(mesh)
+        entry = self._entries.get(key)
+        # The entry holds the mesh itself, so its id cannot be reused while cached
+        if (
+            entry is not None
+            and entry[0] is mesh
+            and entry[1] == mesh.version
+            and entry[2] == (width, height, guard_band)
+            and np.array_equal(entry[3], mvp.to_array())
+        ):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            profiler.count("vertex_cache_hits")
+            return entry[4]
+
+        self.misses += 1
+        profiler.count("vertex_cache_misses")
+        result = prepare_mesh(mesh, mvp, width, height, guard_band)
+        # A copy of the matrix, since Matrix4.matmul(out=) and set() write in place
+        self._entries[key] = (mesh, mesh.version, (width, height, guard_band), mvp.to_array(), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+def render_mesh(
+    raster: Rasterizer,
+    mesh,
+    mvp: Matrix4,
+    framebuffer: np.ndarray,
+    depthbuffer: np.ndarray,
+    cull_backfaces: bool = True,
+    guard_band: Optional[float] = None,
+    hiz: Optional[HiZBuffer] = None,
+    cache: Optional[VertexCache] = None,
+) -> int:
+    """
+    prepare_mesh + Rasterizer.draw_mesh. With a hi-Z buffer, meshes whose
+    bounds are entirely hidden are skipped before the vertex stage; with a
+    VertexCache, unchanged draws reuse their transformed vertices. Returns
+    the number of triangles rasterized.
+    """
+    if hiz is not None and occluded(mesh, mvp, hiz, raster.width, raster.height):
+        profiler.count("draws_occluded")
+        return 0
+    if cache is not None:
+        screen, indices, colors = cache.get(mesh, mvp, raster.width, raster.height, guard_band)
+    else:
+        screen, indices, colors = prepare_mesh(mesh, mvp, raster.width, raster.height, guard_band)
+    return raster.draw_mesh(screen, indices, colors, framebuffer, depthbuffer, cull_backfaces, hiz)
+
+def render_instances(
+    raster: Rasterizer,
+    instances,
+    view_proj: Matrix4,
+    framebuffer: np.ndarray,
+    depthbuffer: np.ndarray,
+    cull_backfaces: bool = True,
+    guard_band: Optional[float] = None,
+    hiz: Optional[HiZBuffer] = None,
+    frustum: Optional[Frustum] = None,
+    batch_vertices: int = 1 << 20,
+) -> int:
+    """
+    Draw an InstancedMesh: instances outside the frustum are dropped by
+    their bounding spheres, the rest are transformed and submitted
+    together, batch_vertices transformed vertices at a time to bound
+    memory. Returns the number of triangles rasterized.
+    """
+    mesh = instances.mesh
+    keep = np.arange(len(instances))
+    if frustum is not None:
+        keep = np.flatnonzero(instances.visible(frustum))
+        profiler.count("instances_culled", len(instances) - len(keep))
+    profiler.count("instances_drawn", len(keep))
+
+    drawn = 0
+    step = max(batch_vertices // max(len(mesh.positions), 1), 1)
+    for start in range(0, len(keep), step):
+        sel = keep[start:start + step]
+        colors = None if instances.colors is None else instances.colors[sel]
+        screen, indices, colors = prepare_instances(
+            mesh, view_proj, instances.matrices[sel], raster.width, raster.height, guard_band, colors,
+        )
+        drawn += raster.draw_mesh(screen, indices, colors, framebuffer, depthbuffer, cull_backfaces, hiz)
+    return drawn
+
+def occluded(mesh, mvp: Matrix4, hiz: HiZBuffer, width: int, height: int) -> bool:
+    """
+    True when the mesh's bounding box is fully behind the hi-Z buffer.
+    Depth is monotonic in view distance, so the nearest point of the box is
+    one of its corners; boxes reaching behind the eye are never rejected.
+    """
+    lo, hi = mesh.aabb()
+    corners = np.array([[x, y, z] for x in (lo[0], hi[0]) for y in (lo[1], hi[1]) for z in (lo[2], hi[2])])
+    clip = mvp.transform_points_homogeneous(corners)
+    if (clip[:, 3] <= 0.0).any():
+        return False
+    screen = viewport(clip[:, :3] / clip[:, 3:], width, height)
+    min_x = max(int(np.floor(screen[:, 0].min())), 0)
+    max_x = min(int(np.ceil (screen[:, 0].max())), width - 1)
+    min_y = max(int(np.floor(screen[:, 1].min())), 0)
+    max_y = min(int(np.ceil (screen[:, 1].max())), height - 1)
+    if min_x > max_x or min_y > max_y:
+        return False  # off-screen, left to clipping and setup
+    return not hiz.visible(screen[:, 2].min(), min_x, max_x, min_y, max_y)
+
+def sort_front_to_back(draws: list, view_proj: Matrix4) -> list:
+    """
+    Order draw calls nearest first so early depth rejection gets to skip
+    what they hide. Each draw is a (mesh, model_matrix, ...) sequence; the
+    key is the clip-space w (view depth) of the mesh's bounding-sphere
+    center. The sort is stable, so equally deep draws keep their order.
+    """
+    if not draws:
+        return []
+    vp = view_proj.to_array()
+    depth = np.array([
+        np.append(draw[0].bounding_sphere()[0], 1.0) @ (vp @ draw[1].to_array())[3]
+        for draw in draws
+    ])
+    return [draws[k] for k in np.argsort(depth, kind="stable")]
@@ -2,13 +2,32 @@
 
 import numpy as np
 import math
+from typing import Optional
+from core.profiling import profiler
+from render import jit
+from render.hiz import HiZBuffer
+
+MODES = ("numpy", "scalar", "incremental", "jit")
+
+# Compiled kernels when Numba is installed, the NumPy path otherwise
+DEFAULT_MODE = "jit" if jit.AVAILABLE else "numpy"
+
+# The incremental mode snaps vertices to 1/16 pixel and fills spans shorter
+# than SHORT_SPAN pixels without NumPy
+SUBPIXEL_BITS = 4
+SHORT_SPAN = 8
 
 class Rasterizer:
-    __slots__ = ("width", "height")
+    __slots__ = ("width", "height", "mode")
 
-    def __init__(self, width: int, height: int):
+    def __init__(self, width: int, height: int, mode: str = DEFAULT_MODE):
+        if mode not in MODES:
+            raise ValueError(f"Unknown raster mode {mode!r}, expected one of {MODES}")
+        if mode == "jit" and not jit.AVAILABLE:
+            raise ValueError("The jit raster mode needs Numba installed")
         self.width  = width
         self.height = height
+        self.mode   = mode
 
     @staticmethod
     def edge(ax: float, ay: float,
@@ -27,9 +46,12 @@ class Rasterizer:
         v1x, v1y, v1z = v1.x, v1.y, v1.z
         v2x, v2y, v2z = v2.x, v2.y, v2.z
 
+        profiler.count("triangles_submitted")
+
         # Compute full 2D area (we no longer cull here)
         area = self.edge(v0x, v0y, v1x, v1y, v2x, v2y)
         if abs(area) < 1e-6:
+            profiler.count("triangles_culled")
             return  # completely degenerate
 
         inv_area = 1.0 / area
@@ -39,8 +61,125 @@ class Rasterizer:
         max_x = min(int(math.ceil (max(v0x, v1x, v2x))), self.width  - 1)
         min_y = max(int(math.floor(min(v0y, v1y, v2y))), 0)
         max_y = min(int(math.ceil (max(v0y, v1y, v2y))), self.height - 1)
+        if min_x > max_x or min_y > max_y:
+            profiler.count("triangles_culled")
+            return  # entirely off-screen
+
+        with profiler.stage("raster"):
+            pixels = self._fill_function()(
+                v0x, v0y, v0z, v1x, v1y, v1z, v2x, v2y, v2z, inv_area,
+                min_x, max_x, min_y, max_y, color, framebuffer, depthbuffer,
+            )
+        profiler.count("triangles_drawn")
+        profiler.count("pixels_shaded", pixels)
+
+    def draw_mesh(
+        self,
+        positions: np.ndarray,
+        indices: np.ndarray,
+        colors: np.ndarray,
+        framebuffer: np.ndarray,
+        depthbuffer: np.ndarray,
+        cull_backfaces: bool = True,
+        hiz: Optional[HiZBuffer] = None,
+    ) -> int:
+        """
+        Rasterize an indexed triangle list in one call.
+
+        positions are (N,3) screen-space x, y and depth, indices (M,3) vertex
+        indices and colors (M,3) one RGB color per face. Backfaces (clockwise
+        on screen, i.e. non-positive area) are culled unless cull_backfaces is
+        False, in which case they are rewound and drawn. With a HiZBuffer
+        for the depthbuffer, triangles and tiles of large triangles that are
+        fully behind it are rejected before any per-pixel work, and the
+        pyramid is refreshed afterwards. Returns the number of triangles
+        that reached the rasterizer.
+        """
+        with profiler.stage("raster"):
+            if self.mode == "jit" and hiz is None:
+                # Setup, culling and fill in one compiled call
+                drawn, pixels = jit.draw_indexed(
+                    positions, indices, colors, framebuffer, depthbuffer, cull_backfaces
+                )
+                _count_batch(len(indices), drawn, pixels)
+                return drawn
+
+            tris, colors, inv_area, boxes = self.setup_triangles(
+                positions, indices, colors, cull_backfaces
+            )
+            if hiz is not None:
+                tris, colors, inv_area, boxes = _reject_occluded(hiz, tris, colors, inv_area, boxes)
+            pixels = 0
+            if self.mode == "numpy":
+                pixels = _rasterize(tris, colors, inv_area, *boxes, framebuffer, depthbuffer, hiz)
+            elif self.mode == "jit":
+                pixels = jit.rasterize(tris, colors, inv_area, *boxes, framebuffer, depthbuffer)
+            else:
+                fill = self._fill_function()
+                min_x, max_x, min_y, max_y = boxes
+                for i in range(len(tris)):
+                    (v0x, v0y, v0z), (v1x, v1y, v1z), (v2x, v2y, v2z) = tris[i]
+                    pixels += fill(
+                        v0x, v0y, v0z, v1x, v1y, v1z, v2x, v2y, v2z, inv_area[i],
+                        int(min_x[i]), int(max_x[i]), int(min_y[i]), int(max_y[i]), colors[i],
+                        framebuffer, depthbuffer,
+                    )
+            if hiz is not None and len(tris):
+                _update_hiz(hiz, depthbuffer, boxes)
+        _count_batch(len(indices), len(tris), pixels)
+        return len(tris)
 
+    def setup_triangles(
+        self,
+        positions: np.ndarray,
+        indices: np.ndarray,
+        colors: np.ndarray,
+        cull_backfaces: bool = True,
+    ):
+        """
+        Gather, cull and bound a screen-space triangle batch.
+
+        Returns (tris (K,3,3), colors (K,3), inv_area (K,), (min_x, max_x,
+        min_y, max_y)) for the K triangles that survive backface culling,
+        degenerate rejection and trivial off-screen rejection.
+        """
+        tris = np.asarray(positions, dtype=float)[np.asarray(indices, dtype=np.intp)]
+        colors = np.asarray(colors, dtype=np.uint8).reshape(-1, 3)
+
+        area = _signed_area(tris)
+        if not cull_backfaces:
+            flip = area < 0
+            if flip.any():
+                tris[flip] = tris[flip][:, [0, 2, 1]]
+                area = _signed_area(tris)
+
+        x = tris[:, :, 0]
+        y = tris[:, :, 1]
+        min_x = np.maximum(np.floor(x.min(axis=1)), 0)
+        max_x = np.minimum(np.ceil (x.max(axis=1)), self.width  - 1)
+        min_y = np.maximum(np.floor(y.min(axis=1)), 0)
+        max_y = np.minimum(np.ceil (y.max(axis=1)), self.height - 1)
+
+        keep = (area >= 1e-6) & (min_x <= max_x) & (min_y <= max_y)
+        boxes = tuple(b[keep].astype(np.int64) for b in (min_x, max_x, min_y, max_y))
+        return tris[keep], colors[keep], 1.0 / area[keep], boxes
+
+    def _fill_function(self):
+        if self.mode == "numpy":
+            return _fill_triangle
+        if self.mode == "incremental":
+            return _fill_incremental
+        if self.mode == "jit":
+            return jit.fill_triangle
+        return self._fill_scalar
+
+    def _fill_scalar(
+        self,
+        v0x, v0y, v0z, v1x, v1y, v1z, v2x, v2y, v2z, inv_area,
+        min_x, max_x, min_y, max_y, color, framebuffer, depthbuffer,
+    ) -> int:
         # Raster loop
+        pixels = 0
         for y in range(min_y, max_y + 1):
             py = y + 0.5
             for x in range(min_x, max_x + 1):
@@ -59,3 +198,207 @@ class Rasterizer:
                     if z < depthbuffer[y, x]:
                         depthbuffer[y, x] = z
                         framebuffer[y, x] = color
+                        pixels += 1
+        return pixels
+
+def _fill_triangle(
+    v0x, v0y, v0z, v1x, v1y, v1z, v2x, v2y, v2z, inv_area,
+    min_x, max_x, min_y, max_y, color, framebuffer, depthbuffer,
+) -> int:
+    # Whole-bounding-box version of the scalar raster loop. The arithmetic is
+    # kept in the same order as Rasterizer.edge so both paths agree bit for bit.
+    px = np.arange(min_x, max_x + 1, dtype=float) + 0.5
+    py = (np.arange(min_y, max_y + 1, dtype=float) + 0.5)[:, None]
+
+    w0 = (px - v1x) * (v2y - v1y) - (py - v1y) * (v2x - v1x)
+    w1 = (px - v2x) * (v0y - v2y) - (py - v2y) * (v0x - v2x)
+    w2 = (px - v0x) * (v1y - v0y) - (py - v0y) * (v1x - v0x)
+
+    mask = (w0 >= 0) & (w1 >= 0) & (w2 >= 0)
+    if not mask.any():
+        return 0
+
+    z = (w0 * inv_area) * v0z + (w1 * inv_area) * v1z + (w2 * inv_area) * v2z
+
+    depth = depthbuffer[min_y:max_y + 1, min_x:max_x + 1]
+    mask &= z < depth
+    depth[mask] = z[mask]
+    framebuffer[min_y:max_y + 1, min_x:max_x + 1][mask] = color
+    return int(np.count_nonzero(mask))
+
+def _fill_incremental(
+    v0x, v0y, v0z, v1x, v1y, v1z, v2x, v2y, v2z, inv_area,
+    min_x, max_x, min_y, max_y, color, framebuffer, depthbuffer,
+) -> int:
+    # Scanline span fill driven by fixed-point edge functions. With vertices
+    # snapped to the subpixel grid every edge function is an exact integer
+    # A*x + B*y + C: it is set up once, stepped by B per row, and each row's
+    # covered span is solved from the three edges instead of testing every
+    # pixel. Pixels exactly on an edge belong to the triangle only if it is
+    # a top or left edge, so triangles sharing an edge draw each pixel once.
+    one = 1 << SUBPIXEL_BITS
+    half = one >> 1
+    x0, y0 = round(v0x * one), round(v0y * one)
+    x1, y1 = round(v1x * one), round(v1y * one)
+    x2, y2 = round(v2x * one), round(v2y * one)
+
+    # Edge i is opposite vertex i, oriented like Rasterizer.edge(a, b, p)
+    edges = []
+    for ax, ay, bx, by in ((x1, y1, x2, y2), (x2, y2, x0, y0), (x0, y0, x1, y1)):
+        a, b = by - ay, ax - bx
+        top_left = a > 0 or (a == 0 and b > 0)
+        # Value at the center of pixel (0, min_y)
+        c = a * (half - ax) + b * (one * min_y + half - ay)
+        edges.append((a * one, b * one, c, 0 if top_left else -1))
+    (s0, r0, c0, b0), (s1, r1, c1, b1), (s2, r2, c2, b2) = edges
+
+    area = (x2 - x0) * (y1 - y0) - (y2 - y0) * (x1 - x0)
+    if area <= 0:
+        return 0  # degenerate or clockwise once snapped
+
+    # Depth is the same plane in x: z = (E0*z0 + E1*z1 + E2*z2) / area
+    dzdx = (s0 * v0z + s1 * v1z + s2 * v2z) / area
+
+    pixels = 0
+    for y in range(min_y, max_y + 1):
+        lo, hi = min_x, max_x
+        for s, c in ((s0, c0 + b0), (s1, c1 + b1), (s2, c2 + b2)):
+            # Covered where s*x + c >= 0
+            if s > 0:
+                lo = max(lo, -(c // s))
+            elif s < 0:
+                hi = min(hi, c // -s)
+            elif c < 0:
+                hi = lo - 1
+        if hi - lo >= SHORT_SPAN:
+            z = (c0 * v0z + c1 * v1z + c2 * v2z) / area + dzdx * np.arange(lo, hi + 1)
+            depth = depthbuffer[y, lo:hi + 1]
+            mask = z < depth
+            depth[mask] = z[mask]
+            framebuffer[y, lo:hi + 1][mask] = color
+            pixels += int(np.count_nonzero(mask))
+        elif lo <= hi:
+            # Short spans: a plain loop beats the array setup
+            z_row = (c0 * v0z + c1 * v1z + c2 * v2z) / area
+            for x in range(lo, hi + 1):
+                z = z_row + dzdx * x
+                if z < depthbuffer[y, x]:
+                    depthbuffer[y, x] = z
+                    framebuffer[y, x] = color
+                    pixels += 1
+        c0 += r0
+        c1 += r1
+        c2 += r2
+    return pixels
+
+
+# Triangles whose bounding box exceeds this many pixels are filled one at a
+# time; smaller ones are packed together into batches of up to BATCH_PIXELS.
+LARGE_TRIANGLE_PIXELS = 4096
+BATCH_PIXELS = 1 << 18
+
+def _signed_area(tris: np.ndarray) -> np.ndarray:
+    # Rasterizer.edge(v0, v1, v2) for every triangle in a (M,3,3) batch
+    v0x, v0y = tris[:, 0, 0], tris[:, 0, 1]
+    v1x, v1y = tris[:, 1, 0], tris[:, 1, 1]
+    v2x, v2y = tris[:, 2, 0], tris[:, 2, 1]
+    return (v2x - v0x) * (v1y - v0y) - (v2y - v0y) * (v1x - v0x)
+
+def _count_batch(submitted: int, drawn: int, pixels: int) -> None:
+    profiler.count("triangles_submitted", submitted)
+    profiler.count("triangles_culled", submitted - drawn)
+    profiler.count("triangles_drawn", drawn)
+    profiler.count("pixels_shaded", pixels)
+
+def _reject_occluded(hiz: HiZBuffer, tris, colors, inv_area, boxes):
+    # Drop whole triangles whose nearest vertex is behind the hi-Z bound of their box
+    keep = hiz.visible(tris[:, :, 2].min(axis=1), *boxes)
+    profiler.count("triangles_occluded", len(tris) - int(np.count_nonzero(keep)))
+    return tris[keep], colors[keep], inv_area[keep], tuple(b[keep] for b in boxes)
+
+def _update_hiz(hiz: HiZBuffer, depthbuffer, boxes) -> None:
+    min_x, max_x, min_y, max_y = boxes
+    hiz.update(depthbuffer, int(min_x.min()), int(max_x.max()), int(min_y.min()), int(max_y.max()))
+
+def _rasterize(
+    tris, colors, inv_area, min_x, max_x, min_y, max_y, framebuffer, depthbuffer,
+    hiz: Optional[HiZBuffer] = None,
+) -> int:
+    # Draw a prepared batch in submission order: big triangles go through the
+    # per-triangle path, runs of small ones through the packed batch path.
+    # With a hi-Z buffer, big triangles only fill the bands of tiles that
+    # are not fully occluded. Returns the number of pixels that passed the
+    # depth test.
+    pixels = 0
+    sizes = (max_x - min_x + 1) * (max_y - min_y + 1)
+    start = 0
+    for big in [*np.flatnonzero(sizes > LARGE_TRIANGLE_PIXELS), len(tris)]:
+        while start < big:
+            # Split the run of small triangles so each batch stays in budget
+            run = np.cumsum(sizes[start:big])
+            stop = start + max(int(np.searchsorted(run, BATCH_PIXELS, side="right")), 1)
+            sl = slice(start, stop)
+            pixels += _fill_batch(
+                tris[sl], colors[sl], inv_area[sl],
+                min_x[sl], max_x[sl], min_y[sl], max_y[sl],
+                framebuffer, depthbuffer,
+            )
+            start = stop
+        if big < len(tris):
+            (v0x, v0y, v0z), (v1x, v1y, v1z), (v2x, v2y, v2z) = tris[big]
+            box = (int(min_x[big]), int(max_x[big]), int(min_y[big]), int(max_y[big]))
+            bands = [box] if hiz is None else hiz.visible_bands(min(v0z, v1z, v2z), *box)
+            for band in bands:
+                pixels += _fill_triangle(
+                    v0x, v0y, v0z, v1x, v1y, v1z, v2x, v2y, v2z, inv_area[big],
+                    *band, colors[big], framebuffer, depthbuffer,
+                )
+            start = big + 1
+    return pixels
+
+def _fill_batch(
+    tris, colors, inv_area, min_x, max_x, min_y, max_y, framebuffer, depthbuffer,
+) -> int:
+    # Rasterize many small triangles at once by concatenating the pixels of
+    # all their bounding boxes into flat arrays.
+    box_w = max_x - min_x + 1
+    counts = box_w * (max_y - min_y + 1)
+    tri = np.repeat(np.arange(len(tris)), counts)
+    k = np.arange(tri.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    xi = min_x[tri] + k % box_w[tri]
+    yi = min_y[tri] + k // box_w[tri]
+    px = xi + 0.5
+    py = yi + 0.5
+
+    v = tris[tri]
+    v0x, v0y = v[:, 0, 0], v[:, 0, 1]
+    v1x, v1y = v[:, 1, 0], v[:, 1, 1]
+    v2x, v2y = v[:, 2, 0], v[:, 2, 1]
+    w0 = (px - v1x) * (v2y - v1y) - (py - v1y) * (v2x - v1x)
+    w1 = (px - v2x) * (v0y - v2y) - (py - v2y) * (v0x - v2x)
+    w2 = (px - v0x) * (v1y - v0y) - (py - v0y) * (v1x - v0x)
+
+    hit = np.flatnonzero((w0 >= 0) & (w1 >= 0) & (w2 >= 0))
+    if hit.size == 0:
+        return 0
+    tri, xi, yi, v = tri[hit], xi[hit], yi[hit], v[hit]
+    ia = inv_area[tri]
+    z = (w0[hit] * ia) * v[:, 0, 2] + (w1[hit] * ia) * v[:, 1, 2] + (w2[hit] * ia) * v[:, 2, 2]
+
+    passed = z < depthbuffer[yi, xi]
+    tri, xi, yi, z = tri[passed], xi[passed], yi[passed], z[passed]
+    if tri.size == 0:
+        return 0
+
+    # Several triangles may cover the same pixel: keep the nearest, and the
+    # earliest submitted on ties, which is what drawing them in order does.
+    pix = yi * depthbuffer.shape[1] + xi
+    order = np.lexsort((tri, z, pix))
+    pix = pix[order]
+    first = np.ones(pix.size, dtype=bool)
+    first[1:] = pix[1:] != pix[:-1]
+    win = order[first]
+
+    depthbuffer[yi[win], xi[win]] = z[win]
+    framebuffer[yi[win], xi[win]] = colors[tri[win]]
+    return int(win.size)
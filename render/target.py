@@ -0,0 +1,36 @@
+# render/target.py
+
+import numpy as np
+from typing import Optional
+from render.hiz import HiZBuffer
+from render.tiled import SharedFrame
+
+class RenderTarget:
+    """
+    Offscreen framebuffer + depthbuffer pair. Needs no display, so the
+    rasterizer and pipeline can render into it headless; Window presents
+    one of these on screen.
+    """
+    def __init__(self, width: int, height: int, shared: bool = False):
+        self.width = width
+        self.height = height
+        # shared=True puts the buffers in shared memory for process-based tiled rasterizers
+        self.frame: Optional[SharedFrame] = SharedFrame(width, height) if shared else None
+        if self.frame is not None:
+            self.framebuffer = self.frame.framebuffer
+            self.depthbuffer = self.frame.depthbuffer
+        else:
+            self.framebuffer = np.zeros((height, width, 3), dtype=np.uint8)
+            self.depthbuffer = np.full((height, width), np.inf, dtype=np.float32)
+        # Coarse depth bounds for early rejection, cleared with the depthbuffer
+        self.hiz = HiZBuffer(width, height)
+
+    def clear(self, color: tuple[int, int, int] = (0, 0, 0)):
+        self.framebuffer[:] = color
+        self.depthbuffer[:] = np.inf
+        self.hiz.clear()
+
+    def close(self) -> None:
+        self.framebuffer = self.depthbuffer = None
+        if self.frame is not None:
+            self.frame.close()
@@ -0,0 +1,199 @@
+# render/tiled.py
+
+import os
+import sys
+import multiprocessing
+import numpy as np
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional
+
+from core.profiling import profiler
+from render import jit
+from render.hiz import HiZBuffer
+from render.rasterizer import Rasterizer, _count_batch, _rasterize, _reject_occluded, _update_hiz
+
+class SharedFrame:
+    """
+    Framebuffer + depthbuffer living in shared memory.
+
+    Worker processes attach to the same segments by name, so tiles are
+    written straight into the buffers the window presents from, with no
+    per-frame copies in either direction.
+    """
+    def __init__(self, width: int, height: int, names: Optional[tuple[str, str]] = None):
+        self.width = width
+        self.height = height
+        self._owner = names is None
+        fb_size = height * width * 3
+        db_size = height * width * np.dtype(np.float32).itemsize
+        if self._owner:
+            self._fb_shm = shared_memory.SharedMemory(create=True, size=fb_size)
+            self._db_shm = shared_memory.SharedMemory(create=True, size=db_size)
+        else:
+            # Attaching processes must not unlink the segments when they exit
+            kwargs = {"track": False} if sys.version_info >= (3, 13) else {}
+            self._fb_shm = shared_memory.SharedMemory(name=names[0], **kwargs)
+            self._db_shm = shared_memory.SharedMemory(name=names[1], **kwargs)
+        self.framebuffer = np.ndarray((height, width, 3), dtype=np.uint8, buffer=self._fb_shm.buf)
+        self.depthbuffer = np.ndarray((height, width), dtype=np.float32, buffer=self._db_shm.buf)
+        if self._owner:
+            self.framebuffer[:] = 0
+            self.depthbuffer[:] = np.inf
+
+    @property
+    def names(self) -> tuple[str, str]:
+        return self._fb_shm.name, self._db_shm.name
+
+    def close(self) -> None:
+        # Drop the array views first, shared memory refuses to close while exported
+        self.framebuffer = None
+        self.depthbuffer = None
+        self._fb_shm.close()
+        self._db_shm.close()
+        if self._owner:
+            self._fb_shm.unlink()
+            self._db_shm.unlink()
+
+
+class TiledRasterizer(Rasterizer):
+    """
+    Rasterizer that bins triangles into screen tiles and fills the tiles in
+    parallel on a worker pool.
+
+    Tiles cover disjoint pixels, so workers never contend for a pixel and
+    each tile sees its triangles in submission order. With processes=True
+    the workers are separate processes writing into a SharedFrame, which
+    must be the one whose buffers are passed to draw_mesh. They are forked
+    unless Numba kernels already started a threading layer that cannot
+    fork (see jit.use_fork_safe_threading); then they are spawned, which
+    needs the usual `if __name__ == "__main__":` guard in the main script.
+    """
+    __slots__ = ("tile_size", "workers", "frame", "_pool")
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        tile_size: int = 128,
+        workers: Optional[int] = None,
+        processes: bool = False,
+        frame: Optional[SharedFrame] = None,
+    ):
+        super().__init__(width, height, "numpy")
+        self.tile_size = tile_size
+        self.workers = workers or os.cpu_count() or 1
+        self.frame = frame
+        if processes:
+            if frame is None:
+                raise ValueError("processes=True needs a SharedFrame to draw into")
+            # Forked workers would hang at exit on threads Numba already started
+            context = None if jit.use_fork_safe_threading() else multiprocessing.get_context("spawn")
+            self._pool: Executor = ProcessPoolExecutor(
+                self.workers,
+                mp_context=context,
+                initializer=_attach_frame,
+                initargs=(width, height, frame.names),
+            )
+        else:
+            self._pool = ThreadPoolExecutor(self.workers)
+
+    @property
+    def processes(self) -> bool:
+        return isinstance(self._pool, ProcessPoolExecutor)
+
+    def draw_mesh(
+        self,
+        positions: np.ndarray,
+        indices: np.ndarray,
+        colors: np.ndarray,
+        framebuffer: np.ndarray,
+        depthbuffer: np.ndarray,
+        cull_backfaces: bool = True,
+        hiz: Optional[HiZBuffer] = None,
+    ) -> int:
+        if self.processes and framebuffer is not self.frame.framebuffer:
+            raise ValueError("Process workers can only draw into their SharedFrame buffers")
+
+        with profiler.stage("raster"):
+            tris, colors, inv_area, boxes = self.setup_triangles(
+                positions, indices, colors, cull_backfaces
+            )
+            if hiz is not None:
+                # Whole-triangle rejection only; the pyramid is read and
+                # refreshed here on the calling thread, never by the workers
+                tris, colors, inv_area, boxes = _reject_occluded(hiz, tris, colors, inv_area, boxes)
+            jobs = []
+            if len(tris):
+                for rect, sel in self.bin_triangles(*boxes):
+                    args = (rect, tris[sel], colors[sel], inv_area[sel], *(b[sel] for b in boxes))
+                    if self.processes:
+                        jobs.append(self._pool.submit(_raster_tile_shared, *args))
+                    else:
+                        jobs.append(self._pool.submit(_raster_tile, *args, framebuffer, depthbuffer))
+            pixels = sum(job.result() for job in jobs)
+            if hiz is not None and len(tris):
+                _update_hiz(hiz, depthbuffer, boxes)
+        _count_batch(len(indices), len(tris), pixels)
+        return len(tris)
+
+    def bin_triangles(self, min_x, max_x, min_y, max_y):
+        """
+        Yield ((x0, x1, y0, y1), triangle indices) for every tile that at
+        least one bounding box touches. Indices stay in submission order.
+        """
+        ts = self.tile_size
+        tiles_x = -(-self.width // ts)
+        tx0, tx1 = min_x // ts, max_x // ts
+        ty0, ty1 = min_y // ts, max_y // ts
+
+        # Expand every triangle into the tiles its bounding box overlaps
+        span_x = tx1 - tx0 + 1
+        counts = span_x * (ty1 - ty0 + 1)
+        tri = np.repeat(np.arange(len(counts)), counts)
+        k = np.arange(tri.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        tile = (ty0[tri] + k // span_x[tri]) * tiles_x + tx0[tri] + k % span_x[tri]
+
+        order = np.argsort(tile, kind="stable")
+        tile, tri = tile[order], tri[order]
+        starts = np.flatnonzero(np.r_[True, tile[1:] != tile[:-1]])
+        for start, stop in zip(starts, [*starts[1:], tile.size]):
+            ty, tx = divmod(int(tile[start]), tiles_x)
+            x0, y0 = tx * ts, ty * ts
+            rect = (x0, min(x0 + ts, self.width) - 1, y0, min(y0 + ts, self.height) - 1)
+            yield rect, tri[start:stop]
+
+    def close(self) -> None:
+        self._pool.shutdown()
+
+    def __enter__(self) -> "TiledRasterizer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _raster_tile(
+    rect, tris, colors, inv_area, min_x, max_x, min_y, max_y, framebuffer, depthbuffer,
+) -> int:
+    # Clamp the bounding boxes to the tile so neighbouring tiles never overlap
+    x0, x1, y0, y1 = rect
+    return _rasterize(
+        tris, colors, inv_area,
+        np.maximum(min_x, x0), np.minimum(max_x, x1),
+        np.maximum(min_y, y0), np.minimum(max_y, y1),
+        framebuffer, depthbuffer,
+    )
+
+# Per-process SharedFrame, attached once by the pool initializer
+_worker_frame: Optional[SharedFrame] = None
+
+def _attach_frame(width: int, height: int, names: tuple[str, str]) -> None:
+    global _worker_frame
+    _worker_frame = SharedFrame(width, height, names)
+
+def _raster_tile_shared(rect, tris, colors, inv_area, min_x, max_x, min_y, max_y) -> int:
+    return _raster_tile(
+        rect, tris, colors, inv_area, min_x, max_x, min_y, max_y,
+        _worker_frame.framebuffer, _worker_frame.depthbuffer,
+    )
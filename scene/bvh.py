@@ -0,0 +1,359 @@
+import math
+import numpy as np
+from typing import Callable, Optional
+from core.matrix import Matrix4
+from scene.frustum import Frustum
+
+class _BoxTree:
+    """
+    Array-backed binary tree over (K,3) item boxes, split at the median
+    centroid along the widest axis.
+
+    Node k has bounds lo[k]/hi[k]; internal nodes have children first[k] and
+    first[k]+1, leaves have first[k] == -1 and own items
+    order[start[k]:start[k]+count[k]]. Children are always allocated after
+    their parent, so refitting can sweep levels from the deepest up.
+    """
+    def __init__(self, lo: np.ndarray, hi: np.ndarray, leaf_size: int):
+        n = len(lo)
+        # Empty boxes (lo > hi) count as centred on the origin
+        centers = np.add(lo, hi, out=np.zeros_like(lo), where=lo <= hi) * 0.5
+        order = np.arange(n)
+        first, start, count, depth = [-1], [0], [n], [0]
+        pending = [(0, 0, n)] if n else []
+        while pending:
+            node, s, e = pending.pop()
+            if e - s <= leaf_size:
+                continue
+            c = centers[order[s:e]]
+            extent = c.max(axis=0) - c.min(axis=0)
+            axis = int(np.argmax(extent))
+            if extent[axis] <= 0.0:
+                continue  # all centroids coincide, keep as a leaf
+            mid = (s + e) // 2
+            part = np.argpartition(c[:, axis], mid - s)
+            order[s:e] = order[s:e][part]
+
+            child = len(first)
+            first[node] = child
+            for cs, ce in ((s, mid), (mid, e)):
+                first.append(-1)
+                start.append(cs)
+                count.append(ce - cs)
+                depth.append(depth[node] + 1)
+            pending.append((child, s, mid))
+            pending.append((child + 1, mid, e))
+
+        self.order = order
+        self.first = np.array(first, dtype=np.int64)
+        self.start = np.array(start, dtype=np.int64)
+        self.count = np.array(count, dtype=np.int64)
+        self.depth = np.array(depth, dtype=np.int64)
+        self.lo = np.empty((len(first), 3))
+        self.hi = np.empty((len(first), 3))
+        self.refit(lo, hi)
+
+    def refit(self, lo: np.ndarray, hi: np.ndarray) -> None:
+        """Recompute node bounds from new item boxes, keeping the topology."""
+        leaves = np.flatnonzero(self.first < 0)
+        if len(lo) == 0:
+            self.lo[:] = 0.0
+            self.hi[:] = 0.0
+        for k in leaves:
+            if self.count[k] == 0:
+                continue
+            items = self.order[self.start[k]:self.start[k] + self.count[k]]
+            self.lo[k] = lo[items].min(axis=0)
+            self.hi[k] = hi[items].max(axis=0)
+        for d in range(int(self.depth.max(initial=0)), -1, -1):
+            nodes = np.flatnonzero((self.depth == d) & (self.first >= 0))
+            left = self.first[nodes]
+            self.lo[nodes] = np.minimum(self.lo[left], self.lo[left + 1])
+            self.hi[nodes] = np.maximum(self.hi[left], self.hi[left + 1])
+        # Nodes holding only empty boxes; the slab and plane tests below
+        # would treat their inverted bounds as unbounded
+        self._empty_list = (self.lo > self.hi).any(axis=1).tolist()
+        self._lo_list = self.lo.tolist()
+        self._hi_list = self.hi.tolist()
+        self._first_list = self.first.tolist()
+
+    def walk_ray(self, origin, direction, visit: Callable[[int, float], float]) -> None:
+        """
+        Visit leaves hit by a ray, nearest box first. visit(leaf, t_enter)
+        returns the current closest hit distance, which prunes the rest.
+        """
+        o = [float(c) for c in origin]
+        inv_d = [1.0 / float(c) if c != 0.0 else math.inf for c in direction]
+        lo, hi, first, empty = self._lo_list, self._hi_list, self._first_list, self._empty_list
+        best = math.inf
+        t0 = None if empty[0] else _slab(lo[0], hi[0], o, inv_d, best)
+        stack = [(t0, 0)] if t0 is not None else []
+        while stack:
+            t_enter, node = stack.pop()
+            if t_enter > best:
+                continue
+            child = first[node]
+            if child < 0:
+                best = visit(node, t_enter)
+                continue
+            ta = None if empty[child] else _slab(lo[child], hi[child], o, inv_d, best)
+            tb = None if empty[child + 1] else _slab(lo[child + 1], hi[child + 1], o, inv_d, best)
+            # Push the farther child first so the nearer one is popped next
+            if ta is not None and tb is not None:
+                if ta < tb:
+                    stack.append((tb, child + 1)); stack.append((ta, child))
+                else:
+                    stack.append((ta, child)); stack.append((tb, child + 1))
+            elif ta is not None:
+                stack.append((ta, child))
+            elif tb is not None:
+                stack.append((tb, child + 1))
+
+    def query_frustum(self, frustum: Frustum) -> list[int]:
+        """Leaves whose bounds intersect the frustum."""
+        leaves = []
+        stack = [0] if len(self.order) else []
+        while stack:
+            node = stack.pop()
+            if self._empty_list[node] or not frustum.intersects_aabb(self.lo[node], self.hi[node]):
+                continue
+            child = self._first_list[node]
+            if child < 0:
+                leaves.append(node)
+            else:
+                stack.append(child + 1)
+                stack.append(child)
+        return leaves
+
+    def leaf_items(self, leaf: int) -> np.ndarray:
+        s = self.start[leaf]
+        return self.order[s:s + self.count[leaf]]
+
+
+class TriangleBVH:
+    """
+    Bounding volume hierarchy over one mesh's triangles (object space).
+    Build it once per mesh; call refit() after the vertices move.
+    """
+    def __init__(self, positions: np.ndarray, indices: np.ndarray, leaf_size: int = 8):
+        self.indices = np.asarray(indices)
+        self._set_triangles(positions)
+        self.tree = _BoxTree(self._lo, self._hi, leaf_size)
+        self._sort_leaf_data()
+
+    def _set_triangles(self, positions: np.ndarray) -> None:
+        tris = np.asarray(positions, dtype=float)[self.indices]
+        self._v0 = tris[:, 0]
+        self._e1 = tris[:, 1] - tris[:, 0]
+        self._e2 = tris[:, 2] - tris[:, 0]
+        self._lo = tris.min(axis=1)
+        self._hi = tris.max(axis=1)
+
+    def _sort_leaf_data(self) -> None:
+        # Store triangle data in tree order so a leaf is one contiguous slice
+        order = self.tree.order
+        self._v0s, self._e1s, self._e2s = self._v0[order], self._e1[order], self._e2[order]
+
+    def refit(self, positions: np.ndarray) -> None:
+        self._set_triangles(positions)
+        self.tree.refit(self._lo, self._hi)
+        self._sort_leaf_data()
+
+    def raycast(self, origin, direction, t_max: float = math.inf) -> Optional[tuple[int, float]]:
+        """Nearest (triangle index, t) along origin + t*direction, or None."""
+        origin = np.asarray(origin, dtype=float)
+        direction = np.asarray(direction, dtype=float)
+        hit = [t_max, -1]
+        tree = self.tree
+
+        def visit(leaf: int, t_enter: float) -> float:
+            s = tree.start[leaf]
+            e = s + tree.count[leaf]
+            if e == s:
+                return hit[0]
+            t = intersect_triangles(origin, direction, self._v0s[s:e], self._e1s[s:e], self._e2s[s:e])
+            k = int(np.argmin(t))
+            if t[k] < hit[0]:
+                hit[0] = float(t[k])
+                hit[1] = int(tree.order[s + k])
+            return hit[0]
+
+        tree.walk_ray(origin, direction, visit)
+        return (hit[1], hit[0]) if hit[1] >= 0 else None
+
+    def query_frustum(self, frustum: Frustum) -> np.ndarray:
+        """Indices of triangles in leaves that intersect the frustum (conservative)."""
+        leaves = self.tree.query_frustum(frustum)
+        if not leaves:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate([self.tree.leaf_items(k) for k in leaves]))
+
+
+class SceneBVH:
+    """
+    Hierarchy over the world-space bounds of every mesh node in a scene.
+
+    Ray casts descend into each candidate mesh's TriangleBVH in object
+    space. After nodes move, refit() updates the bounds of the nodes whose
+    world matrix or mesh changed and sweeps them up the tree without a
+    rebuild; nodes added or removed through add_child/remove_child, or
+    gaining or losing a mesh, make it rebuild instead. Meshes edited in
+    place are only noticed after Mesh.invalidate_bounds().
+
+    Nodes with a singular world matrix (scale 0, i.e. hidden) get an empty
+    box and are never hit or returned.
+    """
+    def __init__(self, root, parent_matrix: Optional[Matrix4] = None, leaf_size: int = 2):
+        self.root = root
+        self.parent_matrix = parent_matrix or Matrix4.identity()
+        self.leaf_size = leaf_size
+        self._build()
+
+    def _build(self) -> None:
+        self.nodes = []
+        self._worlds = []
+        self._structure_version = self.root.structure_version
+        self.root.traverse(self.parent_matrix, self._collect)
+        self._meshes = [None] * len(self.nodes)
+        self._mesh_versions = [-1] * len(self.nodes)
+        self._inverse = np.empty((len(self.nodes), 4, 4))
+        self._degenerate = np.zeros(len(self.nodes), dtype=bool)
+        self._lo = np.zeros((len(self.nodes), 3))
+        self._hi = np.zeros((len(self.nodes), 3))
+        for k in range(len(self.nodes)):
+            self._update_item(k)
+        self.tree = _BoxTree(self._lo, self._hi, self.leaf_size)
+
+    def _collect(self, node, world: Matrix4) -> None:
+        if node.mesh is not None:
+            self.nodes.append(node)
+            self._worlds.append(world)
+
+    def _update_item(self, k: int) -> None:
+        m = self._worlds[k].to_array()
+        mesh = self.nodes[k].mesh
+        self._meshes[k] = mesh
+        self._mesh_versions[k] = mesh.version
+        try:
+            self._inverse[k] = np.linalg.inv(m)
+        except np.linalg.LinAlgError:
+            self._degenerate[k] = True
+            self._lo[k] = np.inf
+            self._hi[k] = -np.inf
+            return
+        self._degenerate[k] = False
+        lo, hi = mesh.aabb()
+        corners = np.array([[x, y, z] for x in (lo[0], hi[0]) for y in (lo[1], hi[1]) for z in (lo[2], hi[2])])
+        world_corners = corners @ m[:3, :3].T + m[:3, 3]
+        self._lo[k] = world_corners.min(axis=0)
+        self._hi[k] = world_corners.max(axis=0)
+
+    def refit(self) -> int:
+        """
+        Refresh bounds from the nodes' current world matrices and meshes.
+        Returns how many nodes were updated (all of them after a rebuild).
+        """
+        if self.root.structure_version != self._structure_version:
+            self._build()
+            return len(self.nodes)
+        index = {id(node): k for k, node in enumerate(self.nodes)}
+        worlds = {}
+        rebuild = []
+
+        def collect(node, world: Matrix4) -> None:
+            k = index.get(id(node))
+            if (k is None) != (node.mesh is None):
+                rebuild.append(node)
+            elif k is not None:
+                worlds[k] = world
+
+        self.root.traverse(self.parent_matrix, collect)
+        if rebuild:
+            self._build()
+            return len(self.nodes)
+        moved = 0
+        for k, world in worlds.items():
+            # Cached world matrices keep their identity while nothing changes
+            mesh = self.nodes[k].mesh
+            if (world is not self._worlds[k] or mesh is not self._meshes[k]
+                    or mesh.version != self._mesh_versions[k]):
+                self._worlds[k] = world
+                self._update_item(k)
+                moved += 1
+        if moved:
+            self.tree.refit(self._lo, self._hi)
+        return moved
+
+    def raycast(self, origin, direction, t_max: float = math.inf):
+        """
+        Nearest hit as (node, triangle index, t) along origin + t*direction
+        in world space, or None.
+        """
+        origin = np.asarray(origin, dtype=float)
+        direction = np.asarray(direction, dtype=float)
+        best = [t_max, None, -1]
+        tree = self.tree
+
+        def visit(leaf: int, t_enter: float) -> float:
+            for k in tree.leaf_items(leaf):
+                if self._degenerate[k]:
+                    continue
+                inv = self._inverse[k]
+                # Affine inverse keeps t: same parameter in both spaces
+                o = inv[:3, :3] @ origin + inv[:3, 3]
+                d = inv[:3, :3] @ direction
+                hit = self.nodes[k].mesh.bvh().raycast(o, d, best[0])
+                if hit is not None and hit[1] < best[0]:
+                    best[0], best[1], best[2] = hit[1], self.nodes[k], hit[0]
+            return best[0]
+
+        tree.walk_ray(origin, direction, visit)
+        return (best[1], best[2], best[0]) if best[1] is not None else None
+
+    def pick(self, camera, mouse_pos: tuple[int, int], width: int, height: int):
+        """raycast() along the camera ray through a pixel, e.g. Input.mouse_pos."""
+        origin, direction = camera.screen_ray(mouse_pos[0], mouse_pos[1], width, height)
+        return self.raycast(origin, direction)
+
+    def query_frustum(self, frustum: Frustum) -> list:
+        """Nodes whose world bounds intersect the frustum."""
+        found = []
+        for leaf in self.tree.query_frustum(frustum):
+            for k in self.tree.leaf_items(leaf):
+                if not self._degenerate[k] and frustum.intersects_aabb(self._lo[k], self._hi[k]):
+                    found.append(self.nodes[k])
+        return found
+
+
+def intersect_triangles(origin, direction, v0, e1, e2) -> np.ndarray:
+    """
+    Two-sided Moller-Trumbore test of one ray against (K,) triangles given
+    as v0 and edge vectors. Returns hit distances, inf where missed.
+    """
+    p = np.cross(direction, e2)
+    det = (e1 * p).sum(axis=1)
+    ok = np.abs(det) > 1e-12
+    inv = np.divide(1.0, det, out=np.zeros_like(det), where=ok)
+    s = origin - v0
+    u = (s * p).sum(axis=1) * inv
+    q = np.cross(s, e1)
+    v = (q @ direction) * inv
+    t = (e2 * q).sum(axis=1) * inv
+    ok &= (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0) & (t > 1e-9)
+    return np.where(ok, t, np.inf)
+
+def _slab(lo, hi, o, inv_d, t_max):
+    # Ray/box entry distance, or None if the ray misses within [0, t_max]
+    t_near, t_far = 0.0, t_max
+    for a in range(3):
+        t1 = (lo[a] - o[a]) * inv_d[a]
+        t2 = (hi[a] - o[a]) * inv_d[a]
+        if t1 > t2:
+            t1, t2 = t2, t1
+        if t1 > t_near:
+            t_near = t1
+        if t2 < t_far:
+            t_far = t2
+        if t_near > t_far:
+            return None
+    return t_near
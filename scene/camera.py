@@ -1,7 +1,46 @@
+import math
+import numpy as np
 from core.matrix import Matrix4
 from core.vector import Vector3
+from scene.frustum import Frustum
+
+def _view_input(name: str) -> property:
+    # position, target and up: Vector3s, copied if they are scratch
+    attr = "_" + name
+    def setter(self, value):
+        setattr(self, attr, value._frozen())
+        self._view = self._view_proj = self._frustum = None
+        self.version += 1
+    return property(lambda self: getattr(self, attr), setter)
+
+def _projection_input(name: str) -> property:
+    attr = "_" + name
+    def setter(self, value):
+        setattr(self, attr, value)
+        self._projection = self._view_proj = self._frustum = None
+        self.version += 1
+    return property(lambda self: getattr(self, attr), setter)
+
 
 class Camera:
+    """
+    Look-at perspective camera with cached matrices.
+
+    The view, projection and view-projection matrices and the frustum are
+    built on first use and kept until an input they depend on is assigned;
+    every assignment also bumps version. As with Transform, Vector3 inputs
+    are treated as immutable (scratch vectors are copied on assignment), so
+    assign a new value instead of mutating one. The returned matrices are
+    shared and cannot be written in place.
+    """
+    position = _view_input("position")
+    target = _view_input("target")
+    up = _view_input("up")
+    fov = _projection_input("fov")
+    aspect = _projection_input("aspect")
+    near = _projection_input("near")
+    far = _projection_input("far")
+
     def __init__(
         self,
         position: Vector3,
@@ -12,6 +51,7 @@ class Camera:
         near: float,
         far: float,
     ):
+        self.version = 0
         self.position = position
         self.target = target
         self.up = up
@@ -21,17 +61,64 @@ class Camera:
         self.far = far
         
     def get_view_matrix(self) -> Matrix4:
-        forward = (self.target - self.position).normalized()
-        right = forward.cross(self.up).normalized()
+        if self._view is not None:
+            return self._view
+
+        position = self._position
+        forward = (self._target - position).normalized()
+        right = forward.cross(self._up).normalized()
         up_true = right.cross(forward)
 
         m = [
-            [ right.x,  right.y,  right.z, -right.dot(self.position) ],
-            [ up_true.x,up_true.y,up_true.z,-up_true.dot(self.position) ],
-            [-forward.x,-forward.y,-forward.z, forward.dot(self.position)],
+            [ right.x,  right.y,  right.z, -right.dot(position) ],
+            [ up_true.x,up_true.y,up_true.z,-up_true.dot(position) ],
+            [-forward.x,-forward.y,-forward.z, forward.dot(position)],
             [ 0.0,       0.0,       0.0,       1.0                    ],
         ]
-        return Matrix4(m)
+        self._view = Matrix4(m)
+        return self._view
 
     def get_projection_matrix(self) -> Matrix4:
-        return Matrix4.perspective(self.fov, self.aspect, self.near, self.far)
\ No newline at end of file
+        if self._projection is None:
+            self._projection = Matrix4.perspective(self._fov, self._aspect, self._near, self._far)
+        return self._projection
+
+    def get_view_projection_matrix(self) -> Matrix4:
+        if self._view_proj is None:
+            self._view_proj = self.get_projection_matrix() @ self.get_view_matrix()
+        return self._view_proj
+
+    def get_frustum(self) -> Frustum:
+        if self._frustum is None:
+            self._frustum = Frustum.from_matrix(self.get_view_projection_matrix())
+        return self._frustum
+
+    def projected_size(self, centers: np.ndarray, radii, viewport_height: int):
+        """
+        Projected diameter in pixels of world-space spheres, given as (3,)
+        or (K,3) centers and radii. Spheres containing the eye are
+        infinitely large.
+        """
+        offset = np.asarray(centers, dtype=float) - self.position.to_array()
+        dist2 = (offset ** 2).sum(axis=-1)
+        radii = np.asarray(radii, dtype=float)
+        inside = dist2 <= radii ** 2
+        # tan of the sphere's angular radius, against tan(fov / 2) for half the viewport
+        tan_half = radii / np.sqrt(np.where(inside, 1.0, dist2 - radii ** 2))
+        size = tan_half / math.tan(self.fov / 2.0) * viewport_height
+        return np.where(inside, np.inf, size)
+
+    def screen_ray(self, x: float, y: float, width: int, height: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        World-space (origin, direction) of the ray through pixel (x, y),
+        using the same viewport mapping as the examples (y down).
+        """
+        ndc_x = x / (width - 1) * 2.0 - 1.0
+        ndc_y = 1.0 - y / (height - 1) * 2.0
+        inv = np.linalg.inv(self.get_view_projection_matrix().to_array())
+        near = inv @ np.array([ndc_x, ndc_y, -1.0, 1.0])
+        far = inv @ np.array([ndc_x, ndc_y, 1.0, 1.0])
+        near = near[:3] / near[3]
+        far = far[:3] / far[3]
+        direction = far - near
+        return near, direction / np.linalg.norm(direction)
@@ -0,0 +1,196 @@
+import numpy as np
+from typing import Callable, Optional
+from core.matrix import Matrix4
+from scene.node import SceneNode
+from scene.frustum import Frustum
+from scene.camera import Camera
+
+class FlatScene:
+    """
+    Flattened form of a SceneNode tree for bulk transform updates.
+
+    Nodes are stored breadth-first, so every depth level is one contiguous
+    slice and a parent always precedes its children. Local and world
+    matrices live in stacked (K,4,4) arrays and world matrices are computed
+    one level at a time with a single batched matmul, with no recursion.
+
+    Adding or removing nodes (SceneNode.add_child / remove_child) below the
+    root bumps the root's structure_version; the next update, sync or
+    traverse then flattens the tree again, which renumbers the nodes.
+    Editing SceneNode.children directly is not tracked.
+    """
+    def __init__(self, root: SceneNode, parent_matrix: Optional[Matrix4] = None):
+        self.root = root
+        self.parent_matrix = (parent_matrix or Matrix4.identity()).to_array()
+        self._build()
+
+    def _build(self) -> None:
+        root = self.root
+        self._structure_version = root.structure_version
+        nodes: list[SceneNode] = [root]
+        parents = [-1]
+        levels = [0]
+        # Breadth-first walk; a level ends where the previous level's children end
+        i = 0
+        while i < len(nodes):
+            level_end = len(nodes)
+            for p in range(i, level_end):
+                for child in nodes[p].children:
+                    nodes.append(child)
+                    parents.append(p)
+            i = level_end
+            if len(nodes) > level_end:
+                levels.append(level_end)
+        levels.append(len(nodes))
+
+        self.nodes = nodes
+        self.parents = np.array(parents, dtype=np.int64)
+        self.level_offsets = np.array(levels, dtype=np.int64)
+        self.index = {id(node): k for k, node in enumerate(nodes)}
+
+        count = len(nodes)
+        self.local = np.empty((count, 4, 4))
+        self.world = np.empty((count, 4, 4))
+        self._versions = np.full(count, -1, dtype=np.int64)
+        self._transforms = [None] * count
+        self._dirty = True
+        self.sync_from_nodes()
+        self.update_world()
+
+    def refresh_structure(self) -> bool:
+        """Flatten the tree again if nodes were added or removed. Returns True if it was."""
+        if self.root.structure_version == self._structure_version:
+            return False
+        self._build()
+        return True
+
+    @classmethod
+    def from_tree(cls, root: SceneNode, parent_matrix: Optional[Matrix4] = None) -> "FlatScene":
+        return cls(root, parent_matrix)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def depth(self) -> int:
+        return len(self.level_offsets) - 1
+
+    def sync_from_nodes(self) -> int:
+        """
+        Pull local matrices of nodes whose transform changed since the last
+        sync. Returns the number of nodes updated.
+        """
+        if self.refresh_structure():
+            return len(self.nodes)
+        updated = 0
+        for k, node in enumerate(self.nodes):
+            transform = node.transform
+            if transform is not self._transforms[k] or transform.version != self._versions[k]:
+                self.local[k] = transform.matrix().to_array()
+                self._transforms[k] = transform
+                self._versions[k] = transform.version
+                updated += 1
+        if updated:
+            self._dirty = True
+        return updated
+
+    def set_local(self, indices: np.ndarray, matrices: np.ndarray) -> None:
+        """
+        Write (n,4,4) local matrices for the given node indices directly,
+        bypassing the node transforms (e.g. for array-driven animation).
+        """
+        if self.root.structure_version != self._structure_version:
+            raise ValueError("The hierarchy changed since these indices were taken; call update() and look them up again")
+        self.local[indices] = matrices
+        self._dirty = True
+
+    def update_world(self) -> bool:
+        """
+        Recompute world matrices level by level if anything changed.
+        Returns True when matrices were recomputed.
+        """
+        if self.refresh_structure():
+            return True
+        if not self._dirty:
+            return False
+        offsets = self.level_offsets
+        np.matmul(self.parent_matrix, self.local[:offsets[1]], out=self.world[:offsets[1]])
+        for start, stop in zip(offsets[1:-1], offsets[2:]):
+            level = slice(start, stop)
+            np.matmul(self.world[self.parents[level]], self.local[level], out=self.world[level])
+        self._dirty = False
+        return True
+
+    def update(self) -> bool:
+        rebuilt = self.refresh_structure()
+        self.sync_from_nodes()
+        return self.update_world() or rebuilt
+
+    def world_matrix(self, node: SceneNode) -> Matrix4:
+        return Matrix4(self.world[self.index[id(node)]])
+
+    def visible(self, frustum: Frustum) -> np.ndarray:
+        """
+        Boolean mask of nodes inside the frustum, testing every mesh's
+        world-space bounding sphere in one batch. Nodes without a mesh
+        count as visible.
+        """
+        mask = np.ones(len(self.nodes), dtype=bool)
+        idx = [k for k, node in enumerate(self.nodes) if node.mesh is not None]
+        if not idx:
+            return mask
+        spheres = [self.nodes[k].mesh.bounding_sphere() for k in idx]
+        centers = np.array([c for c, _ in spheres])
+        radii = np.array([r for _, r in spheres])
+        world = self.world[idx]
+        centers_w = np.einsum("kij,kj->ki", world[:, :3, :3], centers) + world[:, :3, 3]
+        scale = np.sqrt((world[:, :3, :3] ** 2).sum(axis=1).max(axis=1))
+        mask[idx] = frustum.intersects_spheres(centers_w, radii * scale)
+        return mask
+
+    def update_lod(self, camera: Camera, viewport_height: int, mask: Optional[np.ndarray] = None) -> None:
+        """
+        SceneNode.update_lod for every node with an LOD chain (restricted to
+        mask when given), with all projected sizes computed in one batch.
+        """
+        idx = [
+            k for k, node in enumerate(self.nodes)
+            if node.lod is not None and (mask is None or mask[k])
+        ]
+        if not idx:
+            return
+        spheres = [self.nodes[k].lod[0].bounding_sphere() for k in idx]
+        centers = np.array([c for c, _ in spheres])
+        radii = np.array([r for _, r in spheres])
+        world = self.world[idx]
+        centers_w = np.einsum("kij,kj->ki", world[:, :3, :3], centers) + world[:, :3, 3]
+        scale = np.sqrt((world[:, :3, :3] ** 2).sum(axis=1).max(axis=1))
+        sizes = camera.projected_size(centers_w, radii * scale, viewport_height)
+        for k, size in zip(idx, sizes.tolist()):
+            node = self.nodes[k]
+            node.lod_level = node.lod.select(size, node.lod_level)
+
+    def traverse(
+        self,
+        callback: Callable[[SceneNode, Matrix4], None],
+        frustum: Optional[Frustum] = None,
+        camera: Optional[Camera] = None,
+        viewport_height: Optional[int] = None,
+    ) -> None:
+        """
+        SceneNode.traverse over the flattened nodes, in breadth-first order
+        (parents are always visited before children). Transform edits and
+        added or removed nodes are picked up first, as update() does.
+        """
+        if camera is not None and viewport_height is None:
+            raise ValueError("LOD selection needs the viewport height")
+        self.update()
+        mask = None if frustum is None else self.visible(frustum)
+        if camera is not None:
+            self.update_lod(camera, viewport_height, mask)
+        if mask is None:
+            for node, world in zip(self.nodes, self.world):
+                callback(node, Matrix4(world))
+            return
+        for k in np.flatnonzero(mask):
+            callback(self.nodes[k], Matrix4(self.world[k]))
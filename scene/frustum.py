@@ -0,0 +1,51 @@
+import numpy as np
+from core.matrix import Matrix4
+
+class Frustum:
+    """
+    Six clip planes (left, right, bottom, top, near, far) as (6,4) rows
+    (a, b, c, d), normalized so that a*x + b*y + c*z + d is the signed
+    distance of a point, positive on the inside.
+    """
+    __slots__ = ("planes",)
+
+    def __init__(self, planes: np.ndarray):
+        planes = np.array(planes, dtype=float).reshape(6, 4)
+        self.planes = planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+    @classmethod
+    def from_matrix(cls, view_proj: Matrix4) -> "Frustum":
+        # Gribb/Hartmann extraction for OpenGL-style clip space (-w <= z <= w)
+        m = view_proj.to_array()
+        r0, r1, r2, r3 = m
+        return cls([r3 + r0, r3 - r0, r3 + r1, r3 - r1, r3 + r2, r3 - r2])
+
+    def intersects_sphere(self, center: np.ndarray, radius: float) -> bool:
+        dist = self.planes[:, :3] @ center + self.planes[:, 3]
+        return bool((dist >= -radius).all())
+
+    def intersects_spheres(self, centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+        """Vectorized intersects_sphere for (K,3) centers and (K,) radii."""
+        dist = centers @ self.planes[:, :3].T + self.planes[:, 3]
+        return (dist >= -np.asarray(radii)[:, None]).all(axis=1)
+
+    def intersects_aabb(self, lo: np.ndarray, hi: np.ndarray) -> bool:
+        # Test the box corner furthest along each plane normal
+        normals = self.planes[:, :3]
+        corner = np.where(normals >= 0, hi, lo)
+        dist = (normals * corner).sum(axis=1) + self.planes[:, 3]
+        return bool((dist >= 0).all())
+
+    def intersects_mesh(self, world: Matrix4, mesh) -> bool:
+        """
+        Test a mesh's bounding sphere, placed by an affine world matrix.
+        The radius is scaled by the largest axis scale of the matrix.
+        """
+        m = world.to_array()
+        center, radius = mesh.bounding_sphere()
+        center_w = m[:3, :3] @ center + m[:3, 3]
+        scale = np.sqrt((m[:3, :3] ** 2).sum(axis=0).max())
+        return self.intersects_sphere(center_w, radius * scale)
+
+    def __repr__(self):
+        return f"Frustum({self.planes})"
@@ -0,0 +1,66 @@
+import numpy as np
+from typing import Optional
+from scene.frustum import Frustum
+from scene.mesh import Mesh
+from scene.transform import trs_matrices
+
+class InstancedMesh:
+    """
+    One Mesh drawn many times: a (K,4,4) stack of model matrices, set
+    directly or built from position/rotation/scale arrays.
+
+    colors optionally gives every instance one (K,3) RGB color that
+    replaces the mesh's face colors.
+    """
+    def __init__(
+        self,
+        mesh: Mesh,
+        matrices: Optional[np.ndarray] = None,
+        colors: Optional[np.ndarray] = None,
+    ):
+        self.mesh = mesh
+        self.matrices = np.zeros((0, 4, 4)) if matrices is None else _as_matrices(matrices)
+        self.colors = None if colors is None else np.ascontiguousarray(colors, dtype=np.uint8).reshape(-1, 3)
+
+    @classmethod
+    def from_trs(
+        cls,
+        mesh: Mesh,
+        positions: np.ndarray,
+        rotations: Optional[np.ndarray] = None,
+        scales: Optional[np.ndarray] = None,
+        colors: Optional[np.ndarray] = None,
+    ) -> "InstancedMesh":
+        return cls(mesh, trs_matrices(positions, rotations, scales), colors)
+
+    def __len__(self) -> int:
+        return len(self.matrices)
+
+    def set_matrices(self, matrices: np.ndarray) -> None:
+        self.matrices = _as_matrices(matrices)
+
+    def set_trs(
+        self,
+        positions: np.ndarray,
+        rotations: Optional[np.ndarray] = None,
+        scales: Optional[np.ndarray] = None,
+    ) -> None:
+        self.matrices = trs_matrices(positions, rotations, scales)
+
+    def bounding_spheres(self) -> tuple[np.ndarray, np.ndarray]:
+        """World-space (K,3) centers and (K,) radii of every instance."""
+        center, radius = self.mesh.bounding_sphere()
+        m = self.matrices
+        centers = m[:, :3, :3] @ center + m[:, :3, 3]
+        scale = np.sqrt((m[:, :3, :3] ** 2).sum(axis=1).max(axis=1))
+        return centers, radius * scale
+
+    def visible(self, frustum: Frustum) -> np.ndarray:
+        """Boolean mask of instances whose bounding sphere touches the frustum."""
+        if not len(self.matrices):
+            return np.zeros(0, dtype=bool)
+        return frustum.intersects_spheres(*self.bounding_spheres())
+
+
+def _as_matrices(matrices: np.ndarray) -> np.ndarray:
+    return np.ascontiguousarray(matrices, dtype=float).reshape(-1, 4, 4)
@@ -0,0 +1,425 @@
+import os
+import re
+import numpy as np
+from typing import Optional
+from scene.mesh import Mesh
+
+# Bytes read per step when streaming text OBJ and PLY element data
+CHUNK_BYTES = 1 << 24
+DEFAULT_COLOR = (200, 200, 200)
+CACHE_SUFFIX = ".meshcache"
+
+def load_mesh(
+    path: str,
+    use_cache: bool = True,
+    cache_path: Optional[str] = None,
+    color: tuple[int, int, int] = DEFAULT_COLOR,
+    dtype=np.float32,
+) -> Mesh:
+    """
+    Load an .obj or .ply file into a Mesh.
+
+    With use_cache, the parsed arrays are written next to the source
+    (path + CACHE_SUFFIX unless cache_path is given) and later loads memory
+    map that file instead of parsing again, as long as it is newer than the
+    source and was written for the same color and dtype.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == CACHE_SUFFIX:
+        return load_cache(path)
+    cache_path = cache_path or path + CACHE_SUFFIX
+    if use_cache and _cache_matches(cache_path, path, color, dtype):
+        return load_cache(cache_path)
+
+    if ext == ".obj":
+        mesh = load_obj(path, color, dtype)
+    elif ext == ".ply":
+        mesh = load_ply(path, color, dtype)
+    else:
+        raise ValueError(f"Unsupported mesh format {ext!r}, expected .obj, .ply or {CACHE_SUFFIX}")
+    if use_cache:
+        save_cache(mesh, cache_path, color)
+    return mesh
+
+# ---- OBJ ----
+
+_SLASH_SUFFIX = re.compile(rb"/\S*")
+
+def load_obj(path: str, color: tuple[int, int, int] = DEFAULT_COLOR, dtype=np.float32) -> Mesh:
+    """
+    Load the geometry of a Wavefront OBJ file: v and f records, with
+    polygons fan-triangulated and negative (relative) indices resolved.
+    Texture/normal indices, groups and materials are ignored; every face
+    gets color.
+
+    The file is read CHUNK_BYTES at a time and each chunk's records are
+    converted in bulk, so at most one chunk of text is held at once. The
+    per-chunk arrays are concatenated at the end, which briefly needs
+    about twice the size of the output arrays.
+    """
+    positions = []
+    faces = []
+    n_vertices = 0
+    with open(path, "rb") as f:
+        tail = b""
+        while True:
+            block = f.read(CHUNK_BYTES)
+            data = tail + block
+            if block:
+                # Keep the unfinished last line for the next chunk
+                cut = data.rfind(b"\n") + 1
+                data, tail = data[:cut], data[cut:]
+            if data:
+                verts, tris = _parse_obj_chunk(data.split(b"\n"), n_vertices, dtype)
+                positions.append(verts)
+                faces.append(tris)
+                n_vertices += len(verts)
+            if not block:
+                break
+
+    positions = np.concatenate(positions) if positions else np.empty((0, 3), dtype=dtype)
+    indices = np.concatenate(faces) if faces else np.empty((0, 3), dtype=np.int32)
+    if len(indices) and (indices.min() < 0 or indices.max() >= len(positions)):
+        raise ValueError(f"{path}: face index out of range")
+    colors = np.empty((len(indices), 3), dtype=np.uint8)
+    colors[:] = color
+    return Mesh(positions, indices, colors)
+
+def _parse_obj_chunk(lines: list, base: int, dtype) -> tuple[np.ndarray, np.ndarray]:
+    # base is the number of vertices defined in earlier chunks
+    v_lines = []
+    f_lines = []
+    f_defined = []  # vertices defined before each face, for relative indices
+    for line in lines:
+        if line.startswith(b"v "):
+            v_lines.append(line)
+        elif line.startswith(b"f "):
+            f_lines.append(line)
+            f_defined.append(base + len(v_lines))
+
+    # Vertices: all coordinates in one conversion when every record has
+    # exactly x y z, otherwise the first three of each record
+    tokens = b" ".join(v_lines).split()
+    if len(tokens) == 4 * len(v_lines) and all(t == b"v" for t in tokens[::4]):
+        verts = np.array(tokens, dtype=object).reshape(-1, 4)[:, 1:].astype(dtype)
+    else:
+        verts = np.array([line.split()[1:4] for line in v_lines], dtype=dtype).reshape(-1, 3)
+
+    if not f_lines:
+        return verts, np.empty((0, 3), dtype=np.int32)
+    # Drop the /vt/vn parts; all-triangle chunks convert in one go, anything
+    # else is split per record and fan-triangulated
+    tokens = _SLASH_SUFFIX.sub(b"", b" ".join(f_lines)).split()
+    if len(tokens) == 4 * len(f_lines) and all(t == b"f" for t in tokens[::4]):
+        sizes = np.full(len(f_lines), 3, dtype=np.int64)
+        flat = np.array(tokens, dtype=object).reshape(-1, 4)[:, 1:].astype(np.int64).ravel()
+    else:
+        records = [_SLASH_SUFFIX.sub(b"", line).split()[1:] for line in f_lines]
+        sizes = np.fromiter((len(r) for r in records), dtype=np.int64, count=len(records))
+        flat = np.array([t for r in records for t in r], dtype=np.int64)
+    if (sizes < 3).any():
+        raise ValueError("OBJ face with fewer than three vertices")
+
+    # Resolve 1-based and negative indices against the vertices defined so far
+    defined = np.repeat(np.array(f_defined, dtype=np.int64), sizes)
+    flat = np.where(flat < 0, flat + defined, flat - 1)
+
+    tris, _ = _fan_triangulate(flat, sizes)
+    return verts, tris
+
+def _fan_triangulate(flat: np.ndarray, sizes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # flat holds the polygons' vertex indices back to back, sizes their
+    # lengths; returns (triangles, polygon of each triangle). Polygons with
+    # fewer than three vertices produce no triangles
+    starts = np.cumsum(sizes) - sizes
+    fan = np.maximum(sizes - 2, 0)
+    face = np.repeat(np.arange(len(sizes)), fan)
+    k = np.arange(fan.sum()) - np.repeat(np.cumsum(fan) - fan, fan)
+    first = starts[face]
+    tris = np.stack([flat[first], flat[first + k + 1], flat[first + k + 2]], axis=1)
+    return tris.astype(np.int32).reshape(-1, 3), face
+
+# ---- PLY ----
+
+_PLY_TYPES = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4", "double": "f8", "float64": "f8",
+}
+
+def load_ply(path: str, color: tuple[int, int, int] = DEFAULT_COLOR, dtype=np.float32) -> Mesh:
+    """
+    Load a binary (little or big endian) PLY file.
+
+    Vertex x, y, z are read as structured records straight from the file,
+    CHUNK_BYTES at a time. Faces are fan-triangulated; when every face is a
+    triangle they are read as fixed-size records as well. Face colors come
+    from red/green/blue face properties, else the average of the vertex
+    colors, else color.
+    """
+    with open(path, "rb") as f:
+        fmt, elements = _read_ply_header(f)
+        if fmt == "ascii":
+            raise ValueError(f"{path}: ASCII PLY is not supported, convert it to binary")
+        order = "<" if fmt == "binary_little_endian" else ">"
+
+        positions = vertex_colors = None
+        indices = face_colors = None
+        for name, count, props in elements:
+            if name == "vertex":
+                record = _ply_record(props, order)
+                positions = np.empty((count, 3), dtype=dtype)
+                rgb = all(c in record.names for c in ("red", "green", "blue"))
+                vertex_colors = np.empty((count, 3), dtype=np.uint8) if rgb else None
+                for start, chunk in _read_records(f, record, count):
+                    stop = start + len(chunk)
+                    positions[start:stop, 0] = chunk["x"]
+                    positions[start:stop, 1] = chunk["y"]
+                    positions[start:stop, 2] = chunk["z"]
+                    if rgb:
+                        for c, channel in enumerate(("red", "green", "blue")):
+                            vertex_colors[start:stop, c] = chunk[channel]
+            elif name == "face":
+                indices, face_colors = _read_ply_faces(f, props, count, order)
+            else:
+                _skip_element(f, props, count, order)
+
+    if positions is None or indices is None:
+        raise ValueError(f"{path}: PLY file needs vertex and face elements")
+    if len(indices) and (indices.min() < 0 or indices.max() >= len(positions)):
+        raise ValueError(f"{path}: face index out of range")
+    if face_colors is None:
+        if vertex_colors is not None:
+            face_colors = vertex_colors[indices].mean(axis=1).round().astype(np.uint8)
+        else:
+            face_colors = np.empty((len(indices), 3), dtype=np.uint8)
+            face_colors[:] = color
+    return Mesh(positions, indices, face_colors)
+
+def _read_ply_header(f) -> tuple[str, list]:
+    if f.readline().strip() != b"ply":
+        raise ValueError("Not a PLY file")
+    fmt = None
+    elements = []
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError("PLY header is not terminated")
+        words = line.decode("ascii").split()
+        if not words or words[0] in ("comment", "obj_info"):
+            continue
+        if words[0] == "end_header":
+            return fmt, elements
+        if words[0] == "format":
+            fmt = words[1]
+        elif words[0] == "element":
+            elements.append((words[1], int(words[2]), []))
+        elif words[0] == "property":
+            if words[1] == "list":
+                # (name, count type, item type)
+                elements[-1][2].append((words[4], _PLY_TYPES[words[2]], _PLY_TYPES[words[3]]))
+            else:
+                elements[-1][2].append((words[2], _PLY_TYPES[words[1]], None))
+
+def _ply_record(props: list, order: str) -> np.dtype:
+    if any(item is not None for _, _, item in props):
+        raise ValueError("List properties are only supported on faces")
+    return np.dtype([(name, order + kind) for name, kind, _ in props])
+
+def _read_records(f, record: np.dtype, count: int):
+    # Yield (first index, structured chunk) with at most CHUNK_BYTES per read
+    step = max(CHUNK_BYTES // record.itemsize, 1)
+    for start in range(0, count, step):
+        n = min(step, count - start)
+        chunk = np.fromfile(f, dtype=record, count=n)
+        if len(chunk) != n:
+            raise ValueError("PLY file is truncated")
+        yield start, chunk
+
+def _read_ply_faces(f, props: list, count: int, order: str):
+    lists = [p for p in props if p[2] is not None]
+    if len(lists) != 1 or lists[0][0] not in ("vertex_indices", "vertex_index"):
+        raise ValueError("PLY faces need exactly one vertex_indices list property")
+    rgb = all(any(p[0] == c for p in props) for c in ("red", "green", "blue"))
+
+    # Optimistically read fixed-size triangle records; fall back to walking
+    # variable-length records if any face turns out not to be a triangle
+    fields = []
+    for name, kind, item in props:
+        if item is None:
+            fields.append((name, order + kind))
+        else:
+            fields += [("n", order + kind), ("v", order + item, (3,))]
+    record = np.dtype(fields)
+    start_pos = f.tell()
+    indices = np.empty((count, 3), dtype=np.int32)
+    colors = np.empty((count, 3), dtype=np.uint8) if rgb else None
+    for start, chunk in _read_records(f, record, count):
+        if (chunk["n"] != 3).any():
+            f.seek(start_pos)
+            return _read_ply_polygons(f, props, count, order, rgb)
+        stop = start + len(chunk)
+        indices[start:stop] = chunk["v"]
+        if rgb:
+            for c, channel in enumerate(("red", "green", "blue")):
+                colors[start:stop, c] = chunk[channel]
+    return indices, colors
+
+def _read_ply_polygons(f, props, count, order, rgb):
+    # General polygons. The face block is read in one go and record offsets
+    # are found a run at a time: assume the records ahead have as many
+    # vertices as the current one, check all their counts at once and accept
+    # them up to the first that disagrees. All-quad files take a handful of
+    # passes; the run window doubles while guesses keep holding
+    at = next(i for i, p in enumerate(props) if p[2] is not None)
+    _, count_kind, item_kind = props[at]
+    before = _ply_record(props[:at], order)
+    after = _ply_record(props[at + 1:], order)
+    count_type = np.dtype(order + count_kind)
+    item_type = np.dtype(order + item_kind)
+    head = before.itemsize + count_type.itemsize  # bytes up to the first index
+    fixed = head + after.itemsize
+
+    start_pos = f.tell()
+    # Everything after the header; any elements after the faces are rare and small
+    data = np.frombuffer(f.read(), dtype=np.uint8)
+    offsets = np.empty(count, dtype=np.int64)
+    sizes = np.empty(count, dtype=np.int64)
+    done = pos = 0
+    window = 64
+    while done < count:
+        if pos + head > len(data):
+            raise ValueError("PLY file is truncated")
+        n = int(_gather(data, np.array([pos + before.itemsize]), count_type)[0])
+        run = np.arange(min(window, count - done), dtype=np.int64)
+        run *= fixed + n * item_type.itemsize
+        run += pos
+        inside = run[run + head <= len(data)]
+        same = _gather(data, inside + before.itemsize, count_type) == n
+        k = len(inside) if same.all() else int(same.argmin())
+        offsets[done:done + k] = inside[:k]
+        sizes[done:done + k] = n
+        done += k
+        pos = int(inside[k - 1]) + fixed + n * item_type.itemsize
+        window = window * 2 if k == len(run) else 64
+    if pos > len(data):
+        raise ValueError("PLY file is truncated")
+    f.seek(start_pos + pos)
+
+    # Indices of face i start at offsets[i] + head, one item_type apart
+    first = np.cumsum(sizes) - sizes
+    item_starts = np.repeat(offsets + head - first * item_type.itemsize, sizes)
+    item_starts += np.arange(len(item_starts)) * item_type.itemsize
+    flat = _gather(data, item_starts, item_type).astype(np.int64)
+    indices, face = _fan_triangulate(flat, sizes)
+    if not rgb:
+        return indices, None
+
+    colors = np.empty((len(sizes), 3), dtype=np.uint8)
+    for c, channel in enumerate(("red", "green", "blue")):
+        if channel in before.names:
+            kind, offset = before.fields[channel][:2]
+            starts = offsets + offset
+        else:
+            kind, offset = after.fields[channel][:2]
+            starts = offsets + head + sizes * item_type.itemsize + offset
+        colors[:, c] = _gather(data, starts, kind)
+    return indices, colors[face]
+
+def _gather(data: np.ndarray, starts: np.ndarray, kind: np.dtype) -> np.ndarray:
+    # Values of type kind at arbitrary (unaligned) byte offsets of data
+    raw = np.empty((len(starts), kind.itemsize), dtype=np.uint8)
+    for b in range(kind.itemsize):
+        raw[:, b] = data[starts + b]
+    return raw.view(kind).reshape(-1)
+
+def _skip_element(f, props: list, count: int, order: str) -> None:
+    if all(item is None for _, _, item in props):
+        f.seek(count * _ply_record(props, order).itemsize, os.SEEK_CUR)
+        return
+    for _ in range(count):
+        for _, kind, item in props:
+            if item is None:
+                f.seek(np.dtype(kind).itemsize, os.SEEK_CUR)
+            else:
+                n = int(np.fromfile(f, dtype=order + kind, count=1)[0])
+                f.seek(n * np.dtype(item).itemsize, os.SEEK_CUR)
+
+# ---- binary cache ----
+
+_CACHE_MAGIC = b"MESHCACH"
+_CACHE_VERSION = 2
+_ALIGN = 64
+# magic, version, positions dtype (padded str), vertex count, face count,
+# and the default face color the mesh was loaded with
+_CACHE_HEADER = np.dtype([
+    ("magic", "S8"), ("version", "<u4"), ("dtype", "S4"),
+    ("vertices", "<u8"), ("faces", "<u8"), ("color", "u1", (3,)),
+])
+
+def save_cache(mesh: Mesh, path: str, color: tuple[int, int, int] = DEFAULT_COLOR) -> None:
+    """
+    Write a mesh as a header followed by its raw positions, indices and
+    colors, each 64-byte aligned, so load_cache can memory map them.
+    color is the color the mesh was loaded with; it is recorded so that
+    load_mesh only reuses the cache for the same color.
+    Written to a temporary file first so readers never see a partial cache.
+    """
+    positions = np.ascontiguousarray(mesh.positions)
+    header = np.zeros(1, dtype=_CACHE_HEADER)
+    header["magic"] = _CACHE_MAGIC
+    header["version"] = _CACHE_VERSION
+    header["dtype"] = positions.dtype.str.encode("ascii")
+    header["color"] = color
+    header["vertices"] = len(positions)
+    header["faces"] = len(mesh.indices)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(header.tobytes())
+        for array in (positions, mesh.indices.astype("<i4"), mesh.colors):
+            f.write(b"\0" * (-f.tell() % _ALIGN))
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp, path)
+
+def _cache_matches(cache_path: str, source: str, color, dtype) -> bool:
+    # Whether load_mesh can use cache_path for source with these arguments;
+    # caches from older versions are parsed again and overwritten
+    if not os.path.exists(cache_path) or os.path.getmtime(cache_path) < os.path.getmtime(source):
+        return False
+    header = np.fromfile(cache_path, dtype=_CACHE_HEADER, count=1)
+    return (len(header) == 1 and header["magic"][0] == _CACHE_MAGIC
+            and header["version"][0] == _CACHE_VERSION
+            and header["dtype"][0] == np.dtype(dtype).str.encode("ascii")
+            and tuple(header["color"][0]) == tuple(color))
+
+def load_cache(path: str) -> Mesh:
+    """
+    Memory map a file written by save_cache. Nothing is read until the
+    arrays are touched, and the mapping is copy-on-write, so the mesh can
+    still be edited in place without modifying the file.
+    """
+    header = np.fromfile(path, dtype=_CACHE_HEADER, count=1)
+    if len(header) != 1 or header["magic"][0] != _CACHE_MAGIC:
+        raise ValueError(f"{path}: not a mesh cache file")
+    if header["version"][0] != _CACHE_VERSION:
+        raise ValueError(f"{path}: mesh cache version {header['version'][0]} is not supported")
+    n_vertices = int(header["vertices"][0])
+    n_faces = int(header["faces"][0])
+
+    offset = _CACHE_HEADER.itemsize
+    arrays = []
+    for dtype, shape in (
+        (np.dtype(header["dtype"][0].decode("ascii")), (n_vertices, 3)),
+        (np.dtype("<i4"), (n_faces, 3)),
+        (np.dtype(np.uint8), (n_faces, 3)),
+    ):
+        offset += -offset % _ALIGN
+        if shape[0] == 0:
+            arrays.append(np.empty(shape, dtype=dtype))
+        else:
+            arrays.append(np.memmap(path, dtype=dtype, mode="c", offset=offset, shape=shape))
+        offset += dtype.itemsize * shape[0] * shape[1]
+    positions, indices, colors = arrays
+    return Mesh(positions, indices, colors)
@@ -0,0 +1,213 @@
+import heapq
+import math
+import numpy as np
+from typing import Optional, Sequence
+from scene.mesh import Mesh
+
+def simplify(mesh: Mesh, target_faces: int, boundary_weight: float = 1e3) -> Mesh:
+    """
+    Quadric error metric edge-collapse decimation (Garland & Heckbert).
+
+    Every vertex carries the sum of its faces' area-weighted plane
+    quadrics; edges are collapsed cheapest first into the point minimising
+    the combined quadric until at most target_faces faces remain. Open
+    edges get perpendicular constraint planes scaled by boundary_weight so
+    silhouettes of open meshes stay put. Collapses that would flip a face
+    or make the surface non-manifold are skipped. Surviving faces keep
+    their colors; unused vertices are dropped.
+    """
+    positions = mesh.positions.astype(np.float64)
+    faces = mesh.indices.astype(np.int64)
+    n_faces = len(faces)
+    if n_faces <= target_faces:
+        return Mesh(mesh.positions.copy(), mesh.indices.copy(), mesh.colors.copy())
+
+    quadrics = _vertex_quadrics(positions, faces, boundary_weight)
+
+    vertex_faces: list[set] = [set() for _ in range(len(positions))]
+    for f, tri in enumerate(faces.tolist()):
+        for v in tri:
+            vertex_faces[v].add(f)
+    alive = np.ones(n_faces, dtype=bool)
+    removed = np.zeros(len(positions), dtype=bool)
+    version = np.zeros(len(positions), dtype=np.int64)
+
+    edges = np.unique(np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1), axis=0)
+    costs, targets = _edge_costs(quadrics, positions, edges[:, 0], edges[:, 1])
+    # (cost, a, b, version of a, version of b, target); stale entries are skipped on pop
+    heap = [
+        (cost, a, b, 0, 0, tuple(t))
+        for cost, (a, b), t in zip(costs.tolist(), edges.tolist(), targets.tolist())
+    ]
+    heapq.heapify(heap)
+
+    while n_faces > target_faces and heap:
+        _, a, b, ver_a, ver_b, target = heapq.heappop(heap)
+        if removed[a] or removed[b] or version[a] != ver_a or version[b] != ver_b:
+            continue
+
+        shared = vertex_faces[a] & vertex_faces[b]
+        # Link condition: a and b may only share the neighbours of their shared faces
+        ring_a = {v for f in vertex_faces[a] for v in faces[f].tolist()}
+        ring_b = {v for f in vertex_faces[b] for v in faces[f].tolist()}
+        if len(ring_a & ring_b) != len(shared) + 2:
+            continue
+        moved = list((vertex_faces[a] | vertex_faces[b]) - shared)
+        if _flips(positions, faces[moved], a, b, np.array(target)):
+            continue
+
+        positions[a] = target
+        quadrics[a] += quadrics[b]
+        removed[b] = True
+        version[a] += 1
+        for f in vertex_faces[b]:
+            tri = faces[f]
+            tri[tri == b] = a
+        for f in shared:
+            alive[f] = False
+            for v in faces[f].tolist():
+                vertex_faces[v].discard(f)
+        vertex_faces[a] = (vertex_faces[a] | vertex_faces[b]) - shared
+        vertex_faces[b] = set()
+        n_faces -= len(shared)
+
+        ring = np.array(sorted({v for f in vertex_faces[a] for v in faces[f].tolist()} - {a}))
+        if len(ring):
+            costs, targets = _edge_costs(quadrics, positions, np.full(len(ring), a), ring)
+            for cost, c, t in zip(costs.tolist(), ring.tolist(), targets.tolist()):
+                heapq.heappush(heap, (cost, a, c, version[a], version[c], tuple(t)))
+
+    kept = faces[alive]
+    used, remap = np.unique(kept, return_inverse=True)
+    return Mesh(
+        positions[used].astype(mesh.positions.dtype),
+        remap.reshape(-1, 3),
+        mesh.colors[alive],
+    )
+
+def _vertex_quadrics(positions: np.ndarray, faces: np.ndarray, boundary_weight: float) -> np.ndarray:
+    v0, v1, v2 = (positions[faces[:, k]] for k in range(3))
+    normals = np.cross(v1 - v0, v2 - v0)
+    double_area = np.linalg.norm(normals, axis=1)
+    unit = normals / np.where(double_area > 0, double_area, 1.0)[:, None]
+    planes = np.concatenate([unit, -(unit * v0).sum(axis=1, keepdims=True)], axis=1)
+    face_q = 0.5 * double_area[:, None, None] * planes[:, :, None] * planes[:, None, :]
+
+    quadrics = np.zeros((len(positions), 4, 4))
+    for k in range(3):
+        np.add.at(quadrics, faces[:, k], face_q)
+
+    # Open edges (used by a single face) get a plane through the edge,
+    # perpendicular to the face, so collapses cannot pull the border inward
+    half_edges = faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+    _, inverse, counts = np.unique(np.sort(half_edges, axis=1), axis=0, return_inverse=True, return_counts=True)
+    border = np.flatnonzero(counts[inverse.ravel()] == 1)
+    if len(border):
+        a, b = half_edges[border, 0], half_edges[border, 1]
+        edge = positions[b] - positions[a]
+        normal = np.cross(edge, unit[border // 3])
+        length = np.linalg.norm(normal, axis=1)
+        normal /= np.where(length > 0, length, 1.0)[:, None]
+        planes = np.concatenate([normal, -(normal * positions[a]).sum(axis=1, keepdims=True)], axis=1)
+        weight = boundary_weight * (edge ** 2).sum(axis=1)
+        border_q = weight[:, None, None] * planes[:, :, None] * planes[:, None, :]
+        np.add.at(quadrics, a, border_q)
+        np.add.at(quadrics, b, border_q)
+    return quadrics
+
+def _edge_costs(quadrics, positions, a, b) -> tuple[np.ndarray, np.ndarray]:
+    # Cheapest of the quadric optimum (when well conditioned and near the
+    # edge), the two endpoints and the midpoint, for every edge (a, b)
+    q = quadrics[a] + quadrics[b]
+    pa, pb = positions[a], positions[b]
+    mid = 0.5 * (pa + pb)
+    candidates = [pa, pb, mid]
+
+    lhs = q[:, :3, :3]
+    scale = np.trace(lhs, axis1=1, axis2=2)
+    solvable = np.abs(np.linalg.det(lhs)) > 1e-9 * np.maximum(scale, 1e-30) ** 3
+    if solvable.any():
+        optimum = mid.copy()
+        optimum[solvable] = np.linalg.solve(lhs[solvable], -q[solvable, :3, 3:])[..., 0]
+        far = np.linalg.norm(optimum - mid, axis=1) > np.linalg.norm(pb - pa, axis=1)
+        optimum[far] = mid[far]
+        candidates.append(optimum)
+
+    points = np.stack(candidates, axis=1)
+    homogeneous = np.concatenate([points, np.ones(points.shape[:2] + (1,))], axis=2)
+    errors = np.einsum("eci,eij,ecj->ec", homogeneous, q, homogeneous)
+    best = np.argmin(errors, axis=1)
+    rows = np.arange(len(a))
+    return np.maximum(errors[rows, best], 0.0), points[rows, best]
+
+def _flips(positions, tris, a, b, target) -> bool:
+    # True when moving a and b to target turns any face over or makes it degenerate
+    if not len(tris):
+        return False
+    before = positions[tris]
+    after = before.copy()
+    after[(tris == a) | (tris == b)] = target
+    n_before = np.cross(before[:, 1] - before[:, 0], before[:, 2] - before[:, 0])
+    n_after = np.cross(after[:, 1] - after[:, 0], after[:, 2] - after[:, 0])
+    return bool(((n_before * n_after).sum(axis=1) <= 0.0).any())
+
+
+class LODChain:
+    """
+    A mesh and its simplified versions, from full detail down.
+
+    min_sizes[i] is the smallest projected diameter in pixels at which
+    level i is still used; the last level is used below that. By default
+    they are derived from the face counts so roughly pixels_per_triangle
+    pixels of screen area go to every visible triangle.
+    """
+    def __init__(
+        self,
+        levels: Sequence[Mesh],
+        min_sizes: Optional[Sequence[float]] = None,
+        pixels_per_triangle: float = 16.0,
+        hysteresis: float = 0.1,
+    ):
+        if not levels:
+            raise ValueError("An LOD chain needs at least one mesh")
+        self.levels = list(levels)
+        if min_sizes is None:
+            # Disc of diameter d covers pi d^2 / 4 pixels and shows about
+            # half the faces: pi d^2 / (2 F) pixels per triangle
+            min_sizes = [math.sqrt(2.0 * m.face_count * pixels_per_triangle / math.pi) for m in self.levels]
+        min_sizes = list(min_sizes)
+        if len(min_sizes) != len(self.levels):
+            raise ValueError("Need one minimum size per level")
+        min_sizes[-1] = 0.0
+        self.min_sizes = np.array(min_sizes, dtype=float)
+        self.hysteresis = hysteresis
+
+    @classmethod
+    def build(cls, mesh: Mesh, levels: int = 4, ratio: float = 0.5, min_faces: int = 16, **kwargs) -> "LODChain":
+        """Decimate mesh repeatedly by ratio, stopping early at min_faces."""
+        chain = [mesh]
+        while len(chain) < levels:
+            target = int(chain[-1].face_count * ratio)
+            if target < min_faces:
+                break
+            chain.append(simplify(chain[-1], target))
+        return cls(chain, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def __getitem__(self, level: int) -> Mesh:
+        return self.levels[level]
+
+    def select(self, size: float, current: Optional[int] = None) -> int:
+        """
+        Level for a projected diameter of size pixels. With the currently
+        shown level, stay on it while size is within the hysteresis margin
+        of its range, so objects near a threshold don't flicker.
+        """
+        level = int(np.argmax(size >= self.min_sizes))
+        if current is None or current == level or current >= len(self.levels):
+            return level
+        upper = math.inf if current == 0 else self.min_sizes[current - 1] * (1.0 + self.hysteresis)
+        lower = self.min_sizes[current] * (1.0 - self.hysteresis)
+        return current if lower <= size < upper else level
@@ -1,17 +1,117 @@
+import numpy as np
 from core.vector import Vector3
+from scene.bvh import TriangleBVH
 
 class Mesh:
+    """
+    Indexed triangle mesh backed by contiguous arrays.
+
+    positions is (N,3) float32/float64, indices (M,3) int32 and colors (M,3)
+    uint8, one color per face. The constructor also accepts the old list
+    forms (Vector3 vertices, tuple faces and colors) and converts them once.
+    """
     def __init__(
         self,
-        vertices: list[Vector3],
-        faces: list[tuple[int, int, int]],
-        colors: list[tuple[int, int, int]]
+        vertices: "np.ndarray | list[Vector3]",
+        faces: "np.ndarray | list[tuple[int, int, int]]",
+        colors: "np.ndarray | list[tuple[int, int, int]]",
+        dtype=None,
     ):
-        assert len(faces) == len(colors), "One color per face is required"
-        self.vertices = vertices
-        self.faces = faces
-        self.colors = colors
-        
+        self._positions = _as_positions(vertices, dtype)
+        self._indices = np.ascontiguousarray(faces, dtype=np.int32).reshape(-1, 3)
+        self._colors = np.ascontiguousarray(colors, dtype=np.uint8).reshape(-1, 3)
+        assert len(self._indices) == len(self._colors), "One color per face is required"
+        self._aabb = None
+        self._sphere = None
+        self._bvh = None
+        # Bumped on every edit (assignment or invalidate_bounds) so derived
+        # data (vertex caches) can tell
+        self.version = 0
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self._positions
+
+    @positions.setter
+    def positions(self, value: np.ndarray) -> None:
+        self._positions = _as_positions(value, None)
+        self._drop_derived()
+
+    @property
+    def indices(self) -> np.ndarray:
+        return self._indices
+
+    @indices.setter
+    def indices(self, value: np.ndarray) -> None:
+        self._indices = np.ascontiguousarray(value, dtype=np.int32).reshape(-1, 3)
+        self._drop_derived()
+
+    @property
+    def colors(self) -> np.ndarray:
+        return self._colors
+
+    @colors.setter
+    def colors(self, value: np.ndarray) -> None:
+        self._colors = np.ascontiguousarray(value, dtype=np.uint8).reshape(-1, 3)
+        self.version += 1
+
+    def _drop_derived(self) -> None:
+        # New geometry: bounds and the BVH are rebuilt on next use
+        self.version += 1
+        self._aabb = None
+        self._sphere = None
+        self._bvh = None
+
+    @property
+    def vertices(self) -> np.ndarray:
+        return self.positions
+
+    @property
+    def faces(self) -> np.ndarray:
+        return self.indices
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.positions)
+
+    @property
+    def face_count(self) -> int:
+        return len(self.indices)
+
+    def aabb(self) -> tuple[np.ndarray, np.ndarray]:
+        """Cached object-space axis-aligned bounds as (min, max)."""
+        if self._aabb is None:
+            if len(self.positions):
+                self._aabb = (self.positions.min(axis=0), self.positions.max(axis=0))
+            else:
+                self._aabb = (np.zeros(3), np.zeros(3))
+        return self._aabb
+
+    def bounding_sphere(self) -> tuple[np.ndarray, float]:
+        """Cached object-space bounding sphere as (center, radius)."""
+        if self._sphere is None:
+            lo, hi = self.aabb()
+            center = (lo + hi) * 0.5
+            radius = 0.0
+            if len(self.positions):
+                radius = float(np.sqrt(((self.positions - center) ** 2).sum(axis=1).max()))
+            self._sphere = (center, radius)
+        return self._sphere
+
+    def bvh(self) -> TriangleBVH:
+        """Cached object-space triangle BVH, built on first use."""
+        if self._bvh is None:
+            self._bvh = TriangleBVH(self.positions, self.indices)
+        return self._bvh
+
+    def invalidate_bounds(self) -> None:
+        """Call after editing positions (or colors) in place."""
+        self.version += 1
+        self._aabb = None
+        self._sphere = None
+        if self._bvh is not None:
+            self._bvh.refit(self.positions)
+
     @staticmethod
     def create_cube(size: float = 1.0) -> "Mesh":
         h = size / 2.0
@@ -25,7 +125,7 @@ class Mesh:
             Vector3( h,  h,  h),  # 6
             Vector3(-h,  h,  h),  # 7
         ]
-        
+
         faces = [
             # back (z = -h)
             (0, 1, 2), (0, 2, 3),
@@ -40,7 +140,7 @@ class Mesh:
             # top (y = +h)
             (3, 2, 6), (3, 6, 7),
         ]
-        
+
         face_colors = [
             (255,   0,   0),  # back: red
             (255,   0,   0),
@@ -55,5 +155,47 @@ class Mesh:
             (  0, 255, 255),  # top: cyan
             (  0, 255, 255),
         ]
-        
-        return Mesh(vertices, faces, face_colors)
\ No newline at end of file
+
+        return Mesh(vertices, faces, face_colors)
+
+
+    @staticmethod
+    def create_sphere(
+        radius: float = 1.0,
+        rings: int = 16,
+        segments: int = 32,
+        color: tuple[int, int, int] = (200, 200, 200),
+    ) -> "Mesh":
+        # UV sphere, faces wound counter-clockwise seen from outside
+        theta = np.linspace(0.0, np.pi, rings + 1)[:, None]
+        phi = np.linspace(0.0, 2.0 * np.pi, segments + 1)[None, :]
+        vertices = np.stack([
+            radius * np.sin(theta) * np.cos(phi),
+            radius * np.cos(theta) * np.ones_like(phi),
+            -radius * np.sin(theta) * np.sin(phi),
+        ], axis=-1).reshape(-1, 3)
+
+        r, s = np.meshgrid(np.arange(rings), np.arange(segments), indexing="ij")
+        a = r * (segments + 1) + s
+        b = a + segments + 1
+        quads = np.stack([a, b, b + 1, a + 1], axis=-1).reshape(-1, 4)
+        # The pole rings degenerate to triangles; drop the zero-area halves
+        upper = quads[:, [0, 1, 2]][r.ravel() != rings - 1]
+        lower = quads[:, [0, 2, 3]][r.ravel() != 0]
+        faces = np.concatenate([upper, lower])
+
+        colors = np.tile(np.array(color, dtype=np.uint8), (len(faces), 1))
+        return Mesh(vertices, faces, colors)
+
+
+def _as_positions(vertices, dtype) -> np.ndarray:
+    if isinstance(vertices, np.ndarray):
+        # Keep float32/float64 data as-is so callers can hand in views
+        if dtype is None:
+            dtype = vertices.dtype if vertices.dtype in (np.float32, np.float64) else np.float64
+        return np.ascontiguousarray(vertices, dtype=dtype).reshape(-1, 3)
+    positions = np.array(
+        [(v.x, v.y, v.z) for v in vertices], dtype=dtype or np.float64
+    )
+    return positions.reshape(-1, 3)
+
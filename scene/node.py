@@ -1,36 +1,163 @@
+import numpy as np
 from typing import Optional, Callable
 from core.matrix import Matrix4
+from core.profiling import profiler
 from scene.transform import Transform
 from scene.mesh import Mesh
+from scene.frustum import Frustum
+from scene.lod import LODChain
+from scene.camera import Camera
 
 class SceneNode:
+    """
+    Scene graph node with cached local and world matrices.
+
+    The world matrix is only rebuilt when the node's transform changed, the
+    node was reparented or the parent's world matrix changed, so traversing
+    a static scene just hands out the cached matrices.
+
+    A node with an LODChain keeps its full-detail mesh in mesh (for bounds
+    and picking) and draws active_mesh, the level last chosen by
+    update_lod.
+    """
     def __init__(self,
                  mesh: Optional[Mesh] = None,
-                 transform: Optional[Transform] = None):
-        self.mesh = mesh
-        self.transform = transform if transform is not None else Transform()
+                 transform: Optional[Transform] = None,
+                 lod: Optional[LODChain] = None):
+        self.mesh = mesh if mesh is not None or lod is None else lod[0]
+        self.lod = lod
+        self.lod_level = 0
         self.children: list[SceneNode] = []
-        
+        self.parent: Optional[SceneNode] = None
+        self._world: Optional[Matrix4] = None
+        self._parent_world: Optional[Matrix4] = None
+        self._local_version = -1
+        # Bumped on this node and its ancestors whenever a child is added
+        # or removed anywhere below it (FlatScene rebuilds on a mismatch)
+        self.structure_version = 0
+        self.transform = transform if transform is not None else Transform()
+
+    @property
+    def transform(self) -> Transform:
+        return self._transform
+
+    @transform.setter
+    def transform(self, value: Transform) -> None:
+        self._transform = value
+        self.mark_dirty()
+
+    def mark_dirty(self) -> None:
+        # Children notice through the identity of the parent matrix they get
+        self._world = None
+
+    @property
+    def active_mesh(self) -> Optional[Mesh]:
+        return self.mesh if self.lod is None else self.lod[self.lod_level]
+
+    def update_lod(self, world_matrix: Matrix4, camera: Camera, viewport_height: int) -> Optional[Mesh]:
+        """Choose the LOD level from the node's projected size and return the mesh to draw."""
+        if self.lod is None:
+            return self.mesh
+        m = world_matrix.to_array()
+        center, radius = self.lod[0].bounding_sphere()
+        center_w = m[:3, :3] @ center + m[:3, 3]
+        scale = np.sqrt((m[:3, :3] ** 2).sum(axis=0).max())
+        size = float(camera.projected_size(center_w, radius * scale, viewport_height))
+        self.lod_level = self.lod.select(size, self.lod_level)
+        return self.active_mesh
+
     def add_child(self, node: 'SceneNode') -> None:
+        if node.parent is not None:
+            node.parent.remove_child(node)
         self.children.append(node)
-        
+        node.parent = self
+        node.mark_dirty()
+        self._structure_changed()
+
     def remove_child(self, node: 'SceneNode') -> None:
         self.children.remove(node)
-        
+        node.parent = None
+        node.mark_dirty()
+        self._structure_changed()
+
+    def _structure_changed(self) -> None:
+        node = self
+        while node is not None:
+            node.structure_version += 1
+            node = node.parent
+
+    def world_matrix(self, parent_matrix: Matrix4) -> Matrix4:
+        """
+        World matrix under parent_matrix, rebuilt only when something changed.
+
+        Cached world matrices are never written in place, so when
+        parent_matrix is the parent node's cached Matrix4 an identity check
+        is enough. Any other matrix (the traversal root's, usually a fresh
+        identity each frame, or one the caller updates in place) is compared
+        by value against a private copy taken at the last rebuild.
+        """
+        transform = self._transform
+        parent = self.parent
+        cached = parent is not None and parent_matrix is parent._world
+        if (
+            self._world is not None
+            and self._local_version == transform.version
+            and (parent_matrix is self._parent_world or _same_matrix(parent_matrix, self._parent_world))
+        ):
+            if cached:
+                self._parent_world = parent_matrix
+            return self._world
+
+        self._world = parent_matrix @ transform.matrix()
+        self._parent_world = parent_matrix if cached else Matrix4(parent_matrix.to_array())
+        self._local_version = transform.version
+        return self._world
+
     def traverse(
         self,
         parent_matrix: Matrix4,
-        callback: Callable[['SceneNode', Matrix4], None]
+        callback: Callable[['SceneNode', Matrix4], None],
+        frustum: Optional[Frustum] = None,
+        camera: Optional[Camera] = None,
+        viewport_height: Optional[int] = None,
     ) -> None:
+        """
+        Call callback(node, world_matrix) for every node, parents first.
+        With a frustum, nodes whose mesh bounding sphere lies outside it are
+        skipped (their children are still visited). With a camera and the
+        viewport height in pixels, visible nodes with an LOD chain pick
+        their level before the callback sees them; draw node.active_mesh.
+        """
+        if camera is not None and viewport_height is None:
+            raise ValueError("LOD selection needs the viewport height")
+
+        # Depth-first pre-order with an explicit stack, so deep hierarchies
+        # don't hit the recursion limit
+        visited = culled = 0
+        with profiler.stage("traverse"):
+            stack = [(self, parent_matrix)]
+            while stack:
+                node, parent = stack.pop()
+                world_matrix = node.world_matrix(parent)
+                visited += 1
+
+                if frustum is None or node.mesh is None or frustum.intersects_mesh(world_matrix, node.mesh):
+                    if camera is not None and node.lod is not None:
+                        node.update_lod(world_matrix, camera, viewport_height)
+                    callback(node, world_matrix)
+                else:
+                    culled += 1
 
-        local_matrix = self.transform.matrix()
-        world_matrix = parent_matrix @ local_matrix
+                for child in reversed(node.children):
+                    stack.append((child, world_matrix))
+        profiler.count("nodes_visited", visited)
+        profiler.count("nodes_culled", culled)
 
-        callback(self, world_matrix)
+def _same_matrix(a: Matrix4, b: Optional[Matrix4]) -> bool:
+    # Value comparison for world_matrix's cache check; Matrix4 itself
+    # compares by identity
+    return b is not None and np.array_equal(a.to_array(), b.to_array())
 
-        for child in self.children:
-            child.traverse(world_matrix, callback)
-            
 # Quick test block
 if __name__ == "__main__":
     from core.matrix import Matrix4
@@ -1,52 +1,76 @@
+import numpy as np
 from typing import Optional
 from core.vector import Vector3
 from core.matrix import Matrix4
-from core.quaternion import Quaternion
+from core.quaternion import Quaternion, to_rotation_matrices
 
 class Transform:
+    """
+    Position / rotation / scale with a cached local matrix.
+
+    Assigning position, rotation or scale marks the transform dirty and bumps
+    its version, which scene nodes use to invalidate cached world matrices.
+    Vector3 and Quaternion values are treated as immutable: mutate them in
+    place and the change goes unnoticed, so assign a new value instead.
+    Scratch vectors (Vector3.scratch) are copied on assignment.
+    """
     def __init__(
         self,
         position: Optional[Vector3] = None,
         rotation: Optional[Quaternion] = None,
         scale: Optional[Vector3] = None,
     ):
-        self.position = position or Vector3(0.0, 0.0, 0.0)
-        self.rotation = rotation or Quaternion(1.0, 0.0, 0.0, 0.0)
-        self.scale = scale or Vector3(1.0, 1.0, 1.0)
-    
+        self._position = position._frozen() if position is not None else Vector3(0.0, 0.0, 0.0)
+        self._rotation = rotation or Quaternion(1.0, 0.0, 0.0, 0.0)
+        self._scale = scale._frozen() if scale is not None else Vector3(1.0, 1.0, 1.0)
+        self._matrix: Optional[Matrix4] = None
+        self.version = 0
+
+    @property
+    def position(self) -> Vector3:
+        return self._position
+
+    @position.setter
+    def position(self, value: Vector3) -> None:
+        self._position = value._frozen()
+        self.mark_dirty()
+
+    @property
+    def rotation(self) -> Quaternion:
+        return self._rotation
+
+    @rotation.setter
+    def rotation(self, value: Quaternion) -> None:
+        self._rotation = value
+        self.mark_dirty()
+
+    @property
+    def scale(self) -> Vector3:
+        return self._scale
+
+    @scale.setter
+    def scale(self, value: Vector3) -> None:
+        self._scale = value._frozen()
+        self.mark_dirty()
+
+    @property
+    def dirty(self) -> bool:
+        return self._matrix is None
+
+    def mark_dirty(self) -> None:
+        self._matrix = None
+        self.version += 1
+
     def matrix(self) -> Matrix4:
-        T = Matrix4.translation(
-            self.position.x,
-            self.position.y,
-            self.position.z
-        )
-        
-        w, x, y, z = (
-            self.rotation.w,
-            self.rotation.x,
-            self.rotation.y,
-            self.rotation.z
-        )
-        
-        xx, yy, zz = x*x, y*y, z*z
-        xy, xz, yz = x*y, x*z, y*z
-        wx, wy, wz = w*x, w*y, w*z
-        
-        rot = [
-            [1 - 2*(yy + zz), 2*(xy - wz),     2*(xz + wy),     0.0],
-            [2*(xy + wz),     1 - 2*(xx + zz), 2*(yz - wx),     0.0],
-            [2*(xz - wy),     2*(yz + wx),     1 - 2*(xx + yy), 0.0],
-            [0.0,             0.0,             0.0,             1.0]
-        ]
-        R = Matrix4(rot)
-        
-        S = Matrix4.scale(
-            self.scale.x,
-            self.scale.y,
-            self.scale.z
-        )
-        
-        return T @ R @ S
+        """
+        Local T @ R @ S matrix, rebuilt into a new Matrix4 only after a
+        change, so a returned matrix stays a valid snapshot. To refill a
+        buffer you own instead, use write_trs.
+        """
+        if self._matrix is None:
+            m = write_trs(np.empty((4, 4)), self._position, self._rotation, self._scale)
+            self._matrix = Matrix4._wrap(m)
+        return self._matrix
     
     def __repr__(self):
         return (
@@ -55,4 +79,54 @@ class Transform:
             f"  rotation={self.rotation},\n"
             f"  scale={self.scale}\n"
             f")"
-        )
\ No newline at end of file
+        )
+
+
+def write_trs(out: np.ndarray, position: Vector3, rotation: Quaternion, scale: Vector3) -> np.ndarray:
+    """
+    Write T @ R @ S into a (4,4) float array in closed form: the rotation
+    columns times the scale factors, the position as the last column.
+    """
+    w, x, y, z = rotation.w, rotation.x, rotation.y, rotation.z
+    sx, sy, sz = scale.x, scale.y, scale.z
+
+    xx, yy, zz = x*x, y*y, z*z
+    xy, xz, yz = x*y, x*z, y*z
+    wx, wy, wz = w*x, w*y, w*z
+
+    out.reshape(16)[:] = [
+        (1 - 2*(yy + zz))*sx, 2*(xy - wz)*sy,       2*(xz + wy)*sz,       position.x,
+        2*(xy + wz)*sx,       (1 - 2*(xx + zz))*sy, 2*(yz - wx)*sz,       position.y,
+        2*(xz - wy)*sx,       2*(yz + wx)*sy,       (1 - 2*(xx + yy))*sz, position.z,
+        0.0,                  0.0,                  0.0,                  1.0,
+    ]
+    return out
+
+def trs_matrices(
+    positions: np.ndarray,
+    rotations: Optional[np.ndarray] = None,
+    scales: Optional[np.ndarray] = None,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Batched Transform.matrix: (K,4,4) T @ R @ S matrices from (K,3)
+    positions, (K,4) unit quaternions as (w, x, y, z) and (K,3) or (K,)
+    scales. Missing rotations and scales mean identity. out may be a
+    preallocated (K,4,4) float array to fill instead of a new one.
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    count = len(positions)
+    if out is None:
+        out = np.empty((count, 4, 4))
+    if rotations is None:
+        out[:, :3, :3] = np.eye(3)
+    else:
+        out[:, :3, :3] = to_rotation_matrices(np.reshape(rotations, (-1, 4)))
+    if scales is not None:
+        scales = np.asarray(scales, dtype=float)
+        # Scaling the columns is R @ S
+        out[:, :3, :3] *= scales.reshape(count, -1)[:, None, :]
+    out[:, :3, 3] = positions
+    out[:, 3, :3] = 0.0
+    out[:, 3, 3] = 1.0
+    return out
@@ -0,0 +1,45 @@
+import pygame as pg
+from typing import Optional
+from core.profiling import Profiler, profiler as default_profiler
+
+class ProfilerOverlay:
+    """
+    On-screen HUD for a Profiler: FPS, per-stage milliseconds averaged over
+    the profiler's history, and the last frame's counters.
+    """
+    def __init__(
+        self,
+        font: Optional[pg.font.Font] = None,
+        profiler: Optional[Profiler] = None,
+        color: tuple[int, int, int] = (255, 255, 255),
+        line_height: int = 16,
+    ):
+        if font is None:
+            pg.font.init()
+            font = pg.font.SysFont(None, 20)
+        self.font = font
+        self.profiler = profiler or default_profiler
+        self.color = color
+        self.line_height = line_height
+
+    def lines(self, extra: str = "") -> list[str]:
+        avg = self.profiler.average()
+        frame_ms = avg["frame_ms"]
+        fps = 1000.0 / frame_ms if frame_ms else 0.0
+        head = f"FPS {fps:.1f} | frame {frame_ms:.2f} ms"
+        if extra:
+            head += f" | {extra}"
+        out = [head]
+        stages = avg["stages"]
+        if stages:
+            out.append("  ".join(f"{name} {ms:.2f}" for name, ms in sorted(stages.items())))
+        last = self.profiler.last()
+        if last and last["counters"]:
+            out.append("  ".join(f"{name} {n}" for name, n in sorted(last["counters"].items())))
+        return out
+
+    def draw(self, surface: pg.Surface, pos: tuple[int, int] = (10, 10), extra: str = "") -> None:
+        x, y = pos
+        for line in self.lines(extra):
+            surface.blit(self.font.render(line, True, self.color), (x, y))
+            y += self.line_height
@@ -1,8 +1,9 @@
 import pygame as pg
-import numpy as np
+from core.profiling import profiler
+from render.target import RenderTarget
 
 class Window:
-    def __init__(self, width: int, height: int, title: str = "3D Engine"):
+    def __init__(self, width: int, height: int, title: str = "3D Engine", shared: bool = False):
         pg.init()
         self.width = width
         self.height = height
@@ -10,11 +11,18 @@ class Window:
         self.screen = pg.display.set_mode((width, height))
         pg.display.set_caption(self.title)
         self.clock = pg.time.Clock()
-        self.framebuffer = np.zeros((height, width, 3), dtype=np.uint8)
-        self.depthbuffer = np.full((height, width), np.inf, dtype=np.float32)
+        self.target = RenderTarget(width, height, shared)
+        self.framebuffer = self.target.framebuffer
+        self.depthbuffer = self.target.depthbuffer
+        self.hiz = self.target.hiz
+        # Persistent surface over the framebuffer's memory: presenting is a
+        # single blit, with no per-frame Surface allocation or copy
+        self._surface = pg.image.frombuffer(self.framebuffer, (width, height), "RGB")
         self._should_close = False
         
     def tick(self, fps: int = 60) -> float:
+        # One tick per frame: close the profiler frame before waiting
+        profiler.end_frame()
         for event in pg.event.get():
             if event.type == pg.QUIT:
                 self._should_close = True
@@ -25,14 +33,29 @@ class Window:
     def should_close(self) -> bool:
         return self._should_close
     
+    @property
+    def frame(self):
+        return self.target.frame
+
     def clear(self, color: tuple[int, int, int] = (0, 0, 0)):
-        self.framebuffer[:] = color
-        self.depthbuffer[:] = np.inf
+        self.target.clear(color)
         
+    def blit(self):
+        # Draw the framebuffer onto the screen without flipping, so overlays
+        # can be drawn on top before present/flip
+        with profiler.stage("present"):
+            self.screen.blit(self._surface, (0, 0))
+
+    def flip(self):
+        with profiler.stage("flip"):
+            pg.display.flip()
+
     def present(self):
-        surf = pg.surfarray.make_surface(self.framebuffer.swapaxes(0,1))
-        self.screen.blit(surf, (0, 0))
-        pg.display.flip()
+        self.blit()
+        self.flip()
         
     def destroy(self):
+        self._surface = None
+        self.framebuffer = self.depthbuffer = None
+        self.target.close()
         pg.quit()
\ No newline at end of file